@@ -1,9 +1,201 @@
-from flask import Flask, render_template, redirect, request, url_for
+from flask import Flask, render_template, redirect, request, url_for, jsonify
 import ast
+import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "rute"))
+from ai import BusRouteSystem
+from cache import LRUCache
+from csa import format_time, seconds_of_day
+from metrics import CONTENT_TYPE
+from snapshot import load_network
+
+ROUTE_CACHE_SIZE = 1024
+AUTOCOMPLETE_LIMIT = 10
+MAX_ALTERNATIVES = 5
+MAX_ISOCHRONE_MINUTES = 120
+AMBIGUOUS_CANDIDATES = 10  # candidates listed when a halte or wisata query fits several
+# Compiled network (python rute/snapshot.py jaringan.snap), recompiled when its source data changes;
+# workers then share its pages
+SNAPSHOT_PATH = os.environ.get("RUTE_SNAPSHOT", "jaringan.snap")
+# The all-pairs route table grows with the square of the haltes (50 ms on Solo, minutes and GBs at 1,000),
+# so it is only built for small networks; RUTE_PRECOMPUTE=0/1 overrides
+PRECOMPUTE_HALTE_LIMIT = 200
+PRECOMPUTE = os.environ.get("RUTE_PRECOMPUTE", "").lower()
+# Query instrumentation behind /metrics is opt-in: RUTE_METRICS=1
+METRICS_ENABLED = os.environ.get("RUTE_METRICS", "").lower() in ("1", "true", "yes")
 
 app = Flask(__name__)
 
+# One routing engine for the whole app, built once at startup
+if os.path.exists(SNAPSHOT_PATH):
+    bus_system = load_network(SNAPSHOT_PATH)
+else:
+    bus_system = BusRouteSystem()
+if PRECOMPUTE in ("1", "true", "yes") or (
+        PRECOMPUTE not in ("0", "false", "no") and len(bus_system.halte_data) <= PRECOMPUTE_HALTE_LIMIT):
+    bus_system.precompute_all_pairs()
+route_cache = LRUCache(maxsize=ROUTE_CACHE_SIZE)
+if METRICS_ENABLED:
+    metrics = bus_system.enable_metrics()
+    metrics.collect("cache_hits_total", "Lookups answered from a cache", lambda: route_cache.hits, cache="response")
+    metrics.collect("cache_misses_total", "Lookups that had to be computed", lambda: route_cache.misses,
+                    cache="response")
+
+
+class AmbiguousQuery(ValueError):
+    """A halte or wisata query that fits several records; answered with 400 and the candidates"""
+
+    def __init__(self, message, candidates):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def _resolve(search, records, query, kind):
+    index, candidates = search.resolve(query, limit=AMBIGUOUS_CANDIDATES)
+    if index is not None:
+        return records[index]
+    if not candidates:
+        return None
+    candidates = [{"id": records[i]["id"], "name": records[i]["name"]} for i in candidates]
+    names = ", ".join(f"{candidate['name']} ({candidate['id']})" for candidate in candidates)
+    raise AmbiguousQuery(f"{kind} '{query}' cocok dengan beberapa pilihan, sebutkan salah satu: {names}", candidates)
+
+
+def resolve_halte(query):
+    """Halte record for an ID or (partial, possibly misspelled) name typed by the user, None when nothing matches
+
+    Raises AmbiguousQuery unless the query names a single halte (see SearchIndex.resolve).
+    """
+    return _resolve(bus_system.halte_search, bus_system.halte_data, query, "Halte")
+
+
+def resolve_wisata(query):
+    """Wisata record for an ID or (partial, possibly misspelled) name typed by the user, as resolve_halte"""
+    return _resolve(bus_system.wisata_search, bus_system.wisata_data, query, "Tempat wisata")
+
+
+def resolve_pair(halte_awal, halte_tujuan):
+    """(start, end, error) halte records for an origin and destination query"""
+    start = resolve_halte(halte_awal)
+    end = resolve_halte(halte_tujuan)
+    if not start:
+        return None, None, f"Halte asal '{halte_awal}' tidak ditemukan"
+    if not end:
+        return None, None, f"Halte tujuan '{halte_tujuan}' tidak ditemukan"
+    return start, end, None
+
+
+def parse_departure(berangkat):
+    """Seconds after midnight for a "JJ:MM" departure field, None when empty
+
+    Raises ValueError with a message for the user; requests answer it with 400.
+    """
+    if not berangkat:
+        return None
+    try:
+        return seconds_of_day(berangkat)
+    except ValueError:
+        raise ValueError(f"Jam berangkat '{berangkat}' tidak valid (gunakan format JJ:MM, 00:00 sampai 47:59)") from None
+
+
+def route_between(halte_awal, halte_tujuan, departure=None):
+    """(route, error) for two halte queries, served from the response cache when possible
+
+    With departure (seconds, see parse_departure) the route follows the timetable from that time.
+    """
+    start, end, error = resolve_pair(halte_awal, halte_tujuan)
+    if error:
+        return None, error
+    route = route_cache.get_or_compute(
+        ("halte", start["id"], end["id"], departure),
+        lambda: bus_system.find_route(start["id"], end["id"], departure=departure)
+    )
+    if not route:
+        if departure is not None:
+            return None, f"Tidak ada bus dari {start['name']} ke {end['name']} setelah jam {format_time(departure)}"
+        return None, f"Tidak ada rute dari {start['name']} ke {end['name']}"
+    return route, None
+
+
+def alternatives_between(halte_awal, halte_tujuan, jumlah=3):
+    """(routes, error): up to jumlah different routes between two halte queries, shortest first"""
+    start, end, error = resolve_pair(halte_awal, halte_tujuan)
+    if error:
+        return None, error
+    jumlah = max(1, min(jumlah, MAX_ALTERNATIVES))
+    routes = route_cache.get_or_compute(
+        ("alternatif", start["id"], end["id"], jumlah),
+        lambda: bus_system.find_alternative_routes(start["id"], end["id"], k=jumlah)
+    )
+    if not routes:
+        return None, f"Tidak ada rute dari {start['name']} ke {end['name']}"
+    return routes, None
+
+
+def pareto_between(halte_awal, halte_tujuan):
+    """(routes, error): the routes no other beats on time, transfers and fare together, fastest first"""
+    start, end, error = resolve_pair(halte_awal, halte_tujuan)
+    if error:
+        return None, error
+    routes = route_cache.get_or_compute(
+        ("pareto", start["id"], end["id"]),
+        lambda: bus_system.find_pareto_routes(start["id"], end["id"])
+    )
+    if not routes:
+        return None, f"Tidak ada rute dari {start['name']} ke {end['name']}"
+    return routes, None
+
+
+def isochrone_from(halte_asal, menit, departure=None):
+    """(isochrone, error): haltes and wisata reachable within menit minutes, optionally departing at departure"""
+    start = resolve_halte(halte_asal)
+    if not start:
+        return None, f"Halte asal '{halte_asal}' tidak ditemukan"
+    menit = max(1.0, min(menit, MAX_ISOCHRONE_MINUTES))
+    isochrone = route_cache.get_or_compute(
+        ("isokron", start["id"], menit, departure),
+        lambda: bus_system.isochrone(start["id"], menit, departure=departure)
+    )
+    return isochrone, None
+
+
+def route_to_wisata(halte_asal, wisata=None):
+    """(route, error) to the named attraction, or to the nearest one when no name is given"""
+    start = resolve_halte(halte_asal)
+    if not start:
+        return None, f"Halte asal '{halte_asal}' tidak ditemukan"
+    if wisata:
+        record = resolve_wisata(wisata)
+        if not record:
+            return None, f"Tempat wisata '{wisata}' tidak ditemukan"
+        wisata = record["name"]
+    else:
+        _, wisata, _ = bus_system.find_nearest_wisata(start["id"])
+        if not wisata:
+            return None, "Tidak ada tempat wisata"
+    route = route_cache.get_or_compute(
+        ("wisata", start["id"], wisata.lower()),
+        lambda: bus_system.get_route_to_attraction(start["id"], wisata)
+    )
+    if not route:
+        return None, f"Rute dari {start['name']} ke {wisata} tidak ditemukan"
+    return route, None
+
+
+@app.errorhandler(AmbiguousQuery)
+def ambiguous_query(error):
+    if request.path.startswith("/api/"):
+        return jsonify({"error": str(error), "candidates": error.candidates}), 400
+    return render_template("hasil.html", error=str(error)), 400
+
+
+def route_response(route, error):
+    if error:
+        return jsonify({"error": error}), 404
+    return jsonify({"route": route, "analysis": bus_system.get_route_analysis(route)})
+
+
 @app.route("/")
 def home():
     return render_template('beranda.html')
@@ -12,14 +204,111 @@ def home():
 def rute_halte():
     halte_awal = request.form["halte_awal"]
     halte_tujuan = request.form["halte_tujuan"]
-    # Lakukan perhitungan rute terpendek di sini
-    return f"Rute dari {halte_awal} ke {halte_tujuan}"
+    try:
+        departure = parse_departure(request.form.get("berangkat"))
+    except ValueError as e:
+        return render_template("hasil.html", error=str(e)), 400
+    route, error = route_between(halte_awal, halte_tujuan, departure)
+    if error:
+        return render_template("hasil.html", error=error), 404
+    return render_template("hasil.html", route=route, analysis=bus_system.get_route_analysis(route))
 
 @app.route("/rute-wisata", methods=["POST"])
 def rute_wisata():
     halte_asal = request.form["halte_asal"]
-    # Hitung tempat wisata terdekat dari halte
-    return f"Tempat wisata terdekat dari {halte_asal}"
+    route, error = route_to_wisata(halte_asal, request.form.get("wisata"))
+    if error:
+        return render_template("hasil.html", error=error), 404
+    return render_template("hasil.html", route=route, analysis=bus_system.get_route_analysis(route))
+
+@app.route("/api/rute-halte")
+def api_rute_halte():
+    try:
+        departure = parse_departure(request.args.get("berangkat"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return route_response(*route_between(request.args.get("halte_awal", ""), request.args.get("halte_tujuan", ""),
+                                         departure))
+
+@app.route("/api/rute-alternatif")
+def api_rute_alternatif():
+    routes, error = alternatives_between(request.args.get("halte_awal", ""), request.args.get("halte_tujuan", ""),
+                                         request.args.get("jumlah", 3, type=int))
+    if error:
+        return jsonify({"error": error}), 404
+    return jsonify({"routes": [{"route": route, "analysis": bus_system.get_route_analysis(route)} for route in routes]})
+
+@app.route("/api/rute-pareto")
+def api_rute_pareto():
+    routes, error = pareto_between(request.args.get("halte_awal", ""), request.args.get("halte_tujuan", ""))
+    if error:
+        return jsonify({"error": error}), 404
+    cheapest = min(routes, key=lambda route: (route["fare"], route["total_time"]))
+    return jsonify({"fastest": routes[0], "cheapest": cheapest,
+                    "routes": [{"route": route, "analysis": bus_system.get_route_analysis(route)} for route in routes]})
+
+@app.route("/api/isokron")
+def api_isokron():
+    try:
+        departure = parse_departure(request.args.get("berangkat"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    isochrone, error = isochrone_from(request.args.get("halte_asal", ""), request.args.get("menit", 20.0, type=float),
+                                      departure)
+    if error:
+        return jsonify({"error": error}), 404
+    return jsonify(isochrone)
+
+@app.route("/api/rute-wisata")
+def api_rute_wisata():
+    return route_response(*route_to_wisata(request.args.get("halte_asal", ""), request.args.get("wisata")))
+
+@app.route("/peta")
+def peta():
+    # Static network map; a route is drawn on top via ?overlay=/api/rute-overlay?...
+    response = app.response_class(bus_system.base_map_html(), mimetype="text/html")
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
+
+@app.route("/api/jaringan")
+def api_jaringan():
+    return jsonify(bus_system.network_geojson())
+
+@app.route("/api/rute-overlay")
+def api_rute_overlay():
+    route, error = route_between(request.args.get("halte_awal", ""), request.args.get("halte_tujuan", ""))
+    if error:
+        return jsonify({"error": error}), 404
+    return jsonify(bus_system.route_overlay(route["path"]))
+
+@app.route("/api/autocomplete")
+def api_autocomplete():
+    # ?q=<typed text>&jenis=halte|wisata (default both)&limit=<n>
+    query = request.args.get("q", "")
+    jenis = request.args.get("jenis")
+    limit = max(1, min(request.args.get("limit", AUTOCOMPLETE_LIMIT, type=int), 50))
+    suggestions = []
+    for kind, index, records in (("halte", bus_system.halte_search, bus_system.halte_data),
+                                 ("wisata", bus_system.wisata_search, bus_system.wisata_data)):
+        if jenis in (None, "", kind):
+            suggestions += [{"jenis": kind, "id": records[i]["id"], "name": records[i]["name"], "score": score}
+                            for i, score in index.search(query, limit=limit)]
+    suggestions.sort(key=lambda suggestion: -suggestion["score"])
+    response = jsonify(suggestions[:limit])
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
+
+@app.route("/api/cache")
+def api_cache():
+    return jsonify(route_cache.stats())
+
+@app.route("/metrics")
+def metrics_endpoint():
+    if bus_system.metrics is None:
+        return "Instrumentasi tidak aktif; jalankan dengan RUTE_METRICS=1\n", 404, {"Content-Type": CONTENT_TYPE}
+    return bus_system.metrics.render(), 200, {"Content-Type": CONTENT_TYPE}
 
 @app.route("/beranda")
 def beranda():
@@ -30,4 +319,4 @@ def about():
     return render_template("tentang.html")  # Halaman Tentang
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
\ No newline at end of file
+    app.run(debug=True, port=5001)
@@ -0,0 +1,199 @@
+import heapq
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from compact import CompactGraph
+
+# Alternative routes may be at most this much longer than the shortest route
+MAX_STRETCH = 1.25
+# and may share at most this fraction of the shorter route's length with a route already chosen
+MAX_OVERLAP = 0.7
+# Fractions of the allowed detour at which the searches pause to look for alternatives
+STAGES = (0.05, 0.15, 0.4, 1.0)
+
+Links = Dict[int, Tuple[int, int]]  # halte index -> (parent index, route id), as _reconstruct_path takes
+
+
+class TreeSearch:
+    """Resumable A* that keeps its shortest-path tree
+
+    advance(limit) settles haltes in key order until the queue top passes
+    limit; a later call with a larger limit carries on where it stopped.
+    With `within` given, only haltes in it are entered: edges into other
+    haltes are parked and relaxed once `within` has grown to include them.
+    """
+
+    def __init__(self, graph: CompactGraph, source: int, potential: Sequence[float],
+                 within: Optional[Dict[int, float]] = None):
+        self.graph = graph
+        self.potential = potential
+        self.within = within
+        self.settled: Dict[int, float] = {}  # exact distances, in settle order
+        self.parents: Dict[int, Tuple[int, int, float]] = {}  # halte -> (tree neighbour, route id, edge weight)
+        self.g_score = {source: 0.0}
+        self.queue = [(potential[source], 0.0, source)]
+        self.pushes = 1
+        self._parked: List[Tuple[int, int]] = []  # (settled halte, edge slot) waiting for `within`
+
+    def advance(self, limit: float, stop_at: Optional[int] = None) -> None:
+        """Settle haltes until the queue top passes limit, or right after settling stop_at
+
+        stop_at's own edges are not relaxed; routes leaving it again would loop.
+        """
+        graph = self.graph
+        offsets, targets, weights, route_ids = graph.offsets_list, graph.targets_list, graph.weights_list, graph.route_ids_list
+        potential, within, settled, g_score, queue = self.potential, self.within, self.settled, self.g_score, self.queue
+        if self._parked:
+            parked, self._parked = self._parked, []
+            for current, slot in parked:
+                self._relax(current, slot)
+        while queue and queue[0][0] <= limit:
+            _, current_g, current = heapq.heappop(queue)
+            if current in settled:
+                continue
+            settled[current] = current_g
+            if current == stop_at:
+                break
+            for slot in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[slot]
+                if neighbor in settled:
+                    continue
+                if within is not None and neighbor not in within:
+                    self._parked.append((current, slot))
+                    continue
+                tentative_g_score = current_g + weights[slot]
+                if tentative_g_score < g_score.get(neighbor, float('inf')):
+                    self.parents[neighbor] = (current, route_ids[slot], weights[slot])
+                    g_score[neighbor] = tentative_g_score
+                    heapq.heappush(queue, (tentative_g_score + potential[neighbor], tentative_g_score, neighbor))
+                    self.pushes += 1
+
+    def _relax(self, current: int, slot: int) -> None:
+        graph = self.graph
+        neighbor = graph.targets_list[slot]
+        if neighbor in self.settled:
+            return
+        if neighbor not in self.within:
+            self._parked.append((current, slot))
+            return
+        tentative_g_score = self.settled[current] + graph.weights_list[slot]
+        if tentative_g_score < self.g_score.get(neighbor, float('inf')):
+            self.parents[neighbor] = (current, graph.route_ids_list[slot], graph.weights_list[slot])
+            self.g_score[neighbor] = tentative_g_score
+            heapq.heappush(self.queue, (tentative_g_score + self.potential[neighbor], tentative_g_score, neighbor))
+            self.pushes += 1
+
+
+class ViaRouteSearch:
+    """Alternative routes from two shortest-path trees (the via-node method)
+
+    The forward tree is an A* from source that runs on past the target; the
+    backward tree grows from the target over the reversed graph, inside the
+    haltes the forward tree settled and with their exact distances from the
+    source as potential, so it only settles haltes on routes within the
+    current length limit. Every halte settled by both trees is a via point
+    of a route made of two shortest paths. Via points on a run of edges
+    that lies in both trees (a plateau) give the same route, and a long
+    plateau marks a route that is locally shortest rather than a detour,
+    so candidates are ranked by length minus plateau length.
+
+    Both trees pause at growing fractions of the allowed detour (STAGES)
+    and only resume when fewer than k routes were found. Parked edges keep
+    the backward search exact across stages: every edge parked in one stage
+    leads to a halte whose key exceeds that stage's limit.
+    """
+
+    def __init__(self, graph: CompactGraph, reverse_graph: CompactGraph, source: int, target: int,
+                 goal_bounds: Sequence[float]):
+        self.source = source
+        self.target = target
+        self.reverse_graph = reverse_graph
+        self.forward = TreeSearch(graph, source, goal_bounds)
+        self.backward: Optional[TreeSearch] = None  # started once the forward tree has settled the target
+
+    def routes(self, k: int = 3, max_stretch: float = MAX_STRETCH,
+               max_overlap: float = MAX_OVERLAP) -> List[Tuple[Links, float]]:
+        """Up to k (links, total distance) routes, shortest first, pairwise sharing at most max_overlap
+
+        The shortest route is the forward tree path, exactly as A* finds it.
+        """
+        source, target, forward = self.source, self.target, self.forward
+        forward.advance(float('inf'), stop_at=target)
+        if target not in forward.settled:
+            return []
+        backward = self.backward = TreeSearch(self.reverse_graph, target, forward.settled, within=forward.settled)
+        shortest_distance = forward.settled[target]
+        chosen = [self._via_route(target)]
+        shortest = chosen[0][1]
+        # Length each tree path shares with the shortest route, extended in settle order (parents first),
+        # so most near-duplicates are dropped without building their route
+        shared_forward = {source: 0.0}
+        shared_backward = {target: 0.0}
+        tried = set()
+        for fraction in STAGES:
+            if len(chosen) >= k:
+                break
+            limit = shortest_distance * (1 + (max_stretch - 1) * fraction)
+            forward.advance(limit)
+            backward.advance(limit)
+            for node in islice(forward.settled, len(shared_forward), None):
+                parent = forward.parents[node][0]
+                shared_forward[node] = shared_forward[parent] + shortest.get((parent, node), 0.0)
+            for node in islice(backward.settled, len(shared_backward), None):
+                successor = backward.parents[node][0]
+                shared_backward[node] = shared_backward[successor] + shortest.get((node, successor), 0.0)
+
+            # One candidate per plateau, named after its first halte
+            candidates = []
+            for via, to_target in backward.settled.items():
+                if via in tried or shared_forward[via] + shared_backward[via] > max_overlap * shortest_distance:
+                    continue
+                parent = forward.parents.get(via)
+                if parent is not None and backward.parents.get(parent[0], (None,))[0] == via:
+                    continue
+                end = via
+                while end != target and forward.parents.get(backward.parents[end][0], (None,))[0] == end:
+                    end = backward.parents[end][0]
+                plateau = forward.settled[end] - forward.settled[via]
+                candidates.append((forward.settled[via] + to_target - plateau, via))
+            candidates.sort()
+
+            for _, via in candidates:
+                if len(chosen) >= k:
+                    break
+                tried.add(via)
+                candidate = self._via_route(via)
+                if candidate is None:
+                    continue
+                _, segments, total_distance = candidate
+                if all(sum(length for segment, length in segments.items() if segment in other_segments)
+                       <= max_overlap * min(total_distance, other_distance)
+                       for _, other_segments, other_distance in chosen):
+                    chosen.append(candidate)
+        return [(links, total_distance) for links, _, total_distance in chosen]
+
+    def _via_route(self, via: int) -> Optional[Tuple[Links, Dict[Tuple[int, int], float], float]]:
+        """(links, segment lengths, total distance) of the forward tree path to via and the backward one on
+
+        None when the two halves cross, which would make the route loop. The
+        distance is summed in path order, as every engine does.
+        """
+        links: Links = {}
+        segments: Dict[Tuple[int, int], float] = {}
+        total_distance = self.forward.settled[via]
+        node = via
+        while node != self.target:
+            successor, route_id, weight = self.backward.parents[node]
+            links[successor] = (node, route_id)
+            segments[(node, successor)] = weight
+            total_distance += weight
+            node = successor
+        node = via
+        while node != self.source:
+            parent, route_id, weight = self.forward.parents[node]
+            if parent in links:
+                return None
+            links[node] = (parent, route_id)
+            segments[(parent, node)] = weight
+            node = parent
+        return links, segments, total_distance
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from ai import BusRouteSystem, HALTE_DATA, WISATA_DATA, ROUTE_SEQUENCES, ROUTE_COLORS
+from ch import ContractionHierarchy
+from synthetic import generate_network
+
+DEFAULT_SCALES = (1, 8, 32)
+SEED = 20240601
+TILE_DEGREES = 0.15  # offset between copies of the Solo network in a tiled benchmark network
+MAP_BENCH_LIMIT = 5000  # larger networks skip the map cases: one base map takes tens of seconds
+
+
+def tiled_network(copies: int) -> Dict:
+    """BusRouteSystem keyword arguments for `copies` side-by-side copies of the Solo network
+
+    Copy k gets IDs and route names suffixed with -k; connector routes join
+    neighbouring copies so every halte stays reachable.
+    """
+    if copies == 1:
+        return {}
+    columns = int(np.ceil(np.sqrt(copies)))
+    halte_data, wisata_data, route_sequences, route_colors = [], [], {}, {}
+    for k in range(copies):
+        dlat, dlon = TILE_DEGREES * (k // columns), TILE_DEGREES * (k % columns)
+        for halte in HALTE_DATA:
+            halte_data.append(dict(halte, id=f"{halte['id']}-{k}", lat=halte["lat"] + dlat, lon=halte["lon"] + dlon,
+                                   routes=[f"{route}-{k}" for route in halte["routes"]]))
+        for wisata in WISATA_DATA:
+            wisata_data.append(dict(wisata, id=f"{wisata['id']}-{k}", name=f"{wisata['name']} {k}",
+                                    lat=wisata["lat"] + dlat, lon=wisata["lon"] + dlon,
+                                    halte=[f"{h_id}-{k}" for h_id in wisata["halte"]]))
+        for route, stops in ROUTE_SEQUENCES.items():
+            route_sequences[f"{route}-{k}"] = [f"{h_id}-{k}" for h_id in stops]
+            route_colors[f"{route}-{k}"] = ROUTE_COLORS.get(route, "#3388ff")
+        if k:
+            route_sequences[f"L{k}"] = [f"H01-{k - 1}", f"H21-{k}"]
+            route_colors[f"L{k}"] = "#888888"
+    halte_by_id = {halte["id"]: halte for halte in halte_data}
+    for route, stops in route_sequences.items():
+        if route.startswith("L"):
+            for h_id in stops:
+                halte_by_id[h_id]["routes"].append(route)
+    return {"halte_data": halte_data, "wisata_data": wisata_data,
+            "route_sequences": route_sequences, "route_colors": route_colors}
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict:
+    """Time repeat calls of fn: throughput, mean, p50 and p99 in ms, and tracemalloc peak of one call in KiB"""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    # Traced separately: tracemalloc slows every allocation down
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "repeat": repeat,
+        "ops_per_sec": repeat / samples.sum() if samples.sum() else float("inf"),
+        "mean_ms": float(samples.mean() * 1e3),
+        "p50_ms": float(np.percentile(samples, 50) * 1e3),
+        "p99_ms": float(np.percentile(samples, 99) * 1e3),
+        "peak_kib": peak / 1024,
+    }
+
+
+def _cycler(items: Sequence) -> Callable[[], object]:
+    position = [0]
+
+    def next_item():
+        item = items[position[0] % len(items)]
+        position[0] += 1
+        return item
+    return next_item
+
+
+def bench_network(scale: int, repeat: int, stops: Optional[int] = None) -> Dict:
+    """All hot-path benchmarks on `scale` tiled copies of Solo, or on a synthetic network of `stops` haltes"""
+    rng = random.Random(SEED + (stops or scale))
+    network = generate_network(stops, seed=SEED) if stops else tiled_network(scale)
+    build_start = time.perf_counter()
+    bus_system = BusRouteSystem(**network)
+    build_seconds = time.perf_counter() - build_start
+    ids = [halte["id"] for halte in bus_system.halte_data]
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(max(repeat, 64))]
+    routes = [route for route in (bus_system.a_star(start, end) for start, end in pairs) if route]
+    paths = [route["path"] for route in routes]
+
+    # _reconstruct_path alone: the search trees are built beforehand
+    trees = []
+    for start_id, end_id in pairs[:64]:
+        g_score, came_from = bus_system._dijkstra(start_id)
+        start, goal = bus_system.halte_index[start_id], bus_system.halte_index[end_id]
+        if goal in g_score:
+            trees.append((came_from, start, goal, g_score[goal]))
+
+    next_pair, next_path, next_tree = _cycler(pairs), _cycler(paths), _cycler(trees)
+    hierarchy_start = time.perf_counter()
+    bus_system.hierarchy = ContractionHierarchy.build(bus_system.compact_graph)
+    hierarchy_seconds = time.perf_counter() - hierarchy_start
+    results = {
+        "build_compact_graph": measure(bus_system._build_compact_graph, max(3, repeat // 20)),
+        "build_graph": measure(bus_system._build_graph, max(3, repeat // 20)),
+        "a_star": measure(lambda: bus_system.a_star(*next_pair()), repeat),
+        "bidirectional": measure(lambda: bus_system.bidirectional_a_star(*next_pair()), repeat),
+        "ch": measure(lambda: bus_system.ch_route(*next_pair()), repeat),
+        "alternatives": measure(lambda: bus_system.find_alternative_routes(*next_pair()), repeat),
+        "pareto": measure(lambda: bus_system.find_pareto_routes(*next_pair()), repeat),
+        "isochrone": measure(lambda: bus_system.isochrone(next_pair()[0], 20), max(3, repeat // 10)),
+        "raptor": measure(lambda: bus_system.find_route(*next_pair(), engine="raptor"), max(3, repeat // 10)),
+        "timed_route": measure(lambda: bus_system.find_timed_route(*next_pair(), "08:00"), max(3, repeat // 10)),
+        "reconstruct_path": measure(lambda: bus_system._reconstruct_path(*next_tree()), repeat),
+        "attractions_along_route": measure(lambda: bus_system.get_attractions_along_route(next_path()), repeat),
+    }
+    if len(bus_system.halte_data) <= MAP_BENCH_LIMIT:
+        bus_system.base_map_html()
+        results["render_route_map"] = measure(lambda: bus_system.render_map(next_path()), max(3, repeat // 10))
+        results["build_base_map"] = measure(lambda: bus_system._build_base_map().get_root().render(), 3, warmup=0)
+    return {
+        "scale": f"{stops} sintetis" if stops else scale,
+        "haltes": len(bus_system.halte_data),
+        "routes": len(bus_system.route_sequences),
+        "edges": bus_system.compact_graph.edge_count,
+        "wisata": len(bus_system.wisata_data),
+        "system_build_s": build_seconds,
+        "hierarchy_build_s": hierarchy_seconds,
+        "results": results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scales: Sequence[int] = DEFAULT_SCALES, repeat: int = 200,
+                   synthetic_stops: Sequence[int] = ()) -> Dict:
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "cpu_count": os.cpu_count(),
+        "seed": SEED,
+        "networks": [bench_network(scale, repeat) for scale in scales] +
+                    [bench_network(0, repeat, stops) for stops in synthetic_stops],
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    """Table of p50/p99/throughput/peak per case; with a baseline, the p50 ratio new/old"""
+    old = {}
+    for network in (baseline or {}).get("networks", []):
+        for case, stats in network["results"].items():
+            old[(network["scale"], case)] = stats
+    for network in report["networks"]:
+        print(f"\n=== Skala {network['scale']}: {network['haltes']} halte, {network['edges']} sisi, "
+              f"{network['wisata']} wisata (bangun {network['system_build_s']:.2f} s, "
+              f"CH {network.get('hierarchy_build_s', 0.0):.2f} s) ===")
+        print(f"{'kasus':<26}{'p50 ms':>10}{'p99 ms':>10}{'ops/dtk':>12}{'puncak KiB':>12}{'vs lama':>10}")
+        for case, stats in network["results"].items():
+            line = (f"{case:<26}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+                    f"{stats['ops_per_sec']:>12.1f}{stats['peak_kib']:>12.1f}")
+            previous = old.get((network["scale"], case))
+            if previous and previous["p50_ms"]:
+                line += f"{stats['p50_ms'] / previous['p50_ms']:>9.2f}x"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mesin rute dan render peta")
+    parser.add_argument("--skala", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="ukuran jaringan, dalam salinan jaringan Solo (default: 1 8 32)")
+    parser.add_argument("--halte", type=int, nargs="*", default=[],
+                        help="ukuran jaringan sintetis tambahan, dalam jumlah halte (misalnya: 1000 10000 100000)")
+    parser.add_argument("--ulang", type=int, default=200, help="jumlah pengulangan per kasus")
+    parser.add_argument("--keluaran", default="benchmark.json", help="file JSON hasil")
+    parser.add_argument("--bandingkan", help="file JSON hasil sebelumnya untuk perbandingan")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.skala, args.ulang, args.halte)
+    baseline = None
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    with open(args.keluaran, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Hasil benchmark disimpan sebagai '{os.path.abspath(args.keluaran)}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import hashlib
+import heapq
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from compact import CompactGraph
+from snapshot import read_arrays, write_arrays
+
+CH_MAGIC = b"BSTCH\0\0\0"
+CH_VERSION = 1
+WITNESS_SETTLE_LIMIT = 60  # haltes a witness search may settle before a shortcut is added to be safe
+
+Edge = Tuple[int, int, int, float]  # original edge: from halte, to halte, route id, km
+_Arc = Tuple[float, int, int]       # weight, middle halte (-1 for an original edge), route id (-1 for a shortcut)
+_COLUMNS = ("offsets", "targets", "weights", "middle", "route_ids")
+
+
+def graph_fingerprint(graph: CompactGraph) -> str:
+    """Digest of the CSR arrays, so a stored hierarchy is never used with another network"""
+    digest = hashlib.sha1()
+    for array in (graph.offsets, graph.targets, graph.weights, graph.route_ids):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _csr(node_count: int, arcs: List[Tuple[int, int, float, int, int]]) -> Dict[str, np.ndarray]:
+    sources = np.array([arc[0] for arc in arcs], dtype=np.int32)
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return {
+        "offsets": offsets,
+        "targets": np.array([arc[1] for arc in arcs], dtype=np.int32)[order],
+        "weights": np.array([arc[2] for arc in arcs], dtype=np.float64)[order],
+        "middle": np.array([arc[3] for arc in arcs], dtype=np.int32)[order],
+        "route_ids": np.array([arc[4] for arc in arcs], dtype=np.int32)[order],
+    }
+
+
+class ContractionHierarchy:
+    """Shortcut-augmented graph for point-to-point queries that only ever climb in node rank
+
+    Haltes are contracted one by one in `rank` order; contracting a halte adds
+    a shortcut u -> x (through the halte as `middle`) wherever the path
+    u -> halte -> x could be the only shortest one. Every edge is stored
+    with its lower-ranked end: `up` holds edges to higher-ranked haltes for
+    the forward search, `down` holds edges from higher-ranked haltes for the
+    backward search. Both are CSR arrays like CompactGraph, plus the middle
+    halte of each shortcut for unpacking it into original edges.
+    """
+
+    def __init__(self, rank: np.ndarray, up: Dict[str, np.ndarray], down: Dict[str, np.ndarray], fingerprint: str):
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.fingerprint = fingerprint
+        # Memoryviews for the query loop and unpacking, as in CompactGraph: no copy of a mapped file
+        self._up = tuple(memoryview(np.ascontiguousarray(up[name])) for name in _COLUMNS)
+        self._down = tuple(memoryview(np.ascontiguousarray(down[name])) for name in _COLUMNS)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.rank)
+
+    @property
+    def shortcut_count(self) -> int:
+        return int((self.up["middle"] >= 0).sum() + (self.down["middle"] >= 0).sum())
+
+    @classmethod
+    def build(cls, graph: CompactGraph, settle_limit: int = WITNESS_SETTLE_LIMIT) -> "ContractionHierarchy":
+        """Contract every halte of graph, cheapest first (edge difference, contracted neighbours and depth)
+
+        Witness searches are capped at settle_limit haltes; a capped search
+        only adds a shortcut that was not strictly needed, never loses one.
+        """
+        n = graph.node_count
+        inf = float('inf')
+        outgoing: List[Dict[int, _Arc]] = [{} for _ in range(n)]
+        incoming: List[Dict[int, _Arc]] = [{} for _ in range(n)]
+        offsets, targets, weights, route_ids = graph.offsets_list, graph.targets_list, graph.weights_list, graph.route_ids_list
+        for u in range(n):
+            for slot in range(offsets[u], offsets[u + 1]):
+                x, weight = targets[slot], weights[slot]
+                # Parallel edges of several routes: keep the first of the shortest, as a_star does
+                if x != u and weight < outgoing[u].get(x, (inf,))[0]:
+                    outgoing[u][x] = incoming[x][u] = (weight, -1, route_ids[slot])
+
+        def witness_distances(source: int, skipped: int, limit: float, wanted: set) -> Dict[int, float]:
+            distances = {source: 0.0}
+            queue = [(0.0, source)]
+            settled = 0
+            while queue and wanted and settled < settle_limit:
+                distance, node = heapq.heappop(queue)
+                if distance > distances[node]:
+                    continue
+                if distance > limit:
+                    break
+                settled += 1
+                wanted.discard(node)
+                for neighbor, (weight, _, _) in outgoing[node].items():
+                    if neighbor == skipped:
+                        continue
+                    candidate = distance + weight
+                    if candidate < distances.get(neighbor, inf):
+                        distances[neighbor] = candidate
+                        heapq.heappush(queue, (candidate, neighbor))
+            return distances
+
+        def shortcuts(node: int) -> List[Tuple[int, int, float]]:
+            needed = []
+            for u, (weight_in, _, _) in incoming[node].items():
+                direct = outgoing[u]
+                # A direct edge is the cheapest witness; high in the hierarchy it settles most pairs
+                exits = {x: arc[0] for x, arc in outgoing[node].items()
+                         if x != u and direct.get(x, (inf,))[0] > weight_in + arc[0]}
+                if not exits:
+                    continue
+                distances = witness_distances(u, node, weight_in + max(exits.values()), set(exits))
+                for x, weight_out in exits.items():
+                    if distances.get(x, inf) > weight_in + weight_out:
+                        needed.append((u, x, weight_in + weight_out))
+            return needed
+
+        contracted_neighbors = [0] * n
+        depth = [0] * n  # hierarchy levels below a halte; keeps the contraction spread evenly over the map
+
+        def priority(node: int, needed: List) -> int:
+            edge_difference = len(needed) - len(incoming[node]) - len(outgoing[node])
+            return 2 * edge_difference + contracted_neighbors[node] + depth[node]
+
+        queue = [(priority(node, shortcuts(node)), node) for node in range(n)]
+        heapq.heapify(queue)
+        rank = np.empty(n, dtype=np.int32)
+        up_arcs, down_arcs = [], []
+        next_rank = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            needed = shortcuts(node)
+            current = priority(node, needed)
+            # Lazy update: priorities go stale as neighbours are contracted
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+            rank[node] = next_rank
+            next_rank += 1
+            for x, (weight, middle, route) in outgoing[node].items():
+                up_arcs.append((node, x, weight, middle, route))
+                del incoming[x][node]
+                contracted_neighbors[x] += 1
+                depth[x] = max(depth[x], depth[node] + 1)
+            for u, (weight, middle, route) in incoming[node].items():
+                down_arcs.append((node, u, weight, middle, route))
+                del outgoing[u][node]
+                contracted_neighbors[u] += 1
+                depth[u] = max(depth[u], depth[node] + 1)
+            outgoing[node], incoming[node] = {}, {}
+            for u, x, weight in needed:
+                if weight < outgoing[u].get(x, (inf,))[0]:
+                    outgoing[u][x] = incoming[x][u] = (weight, node, -1)
+        return cls(rank, _csr(n, up_arcs), _csr(n, down_arcs), graph_fingerprint(graph))
+
+    def save(self, path: str) -> str:
+        arrays = {"rank": self.rank}
+        for prefix, part in (("up", self.up), ("down", self.down)):
+            arrays.update({f"{prefix}_{name}": array for name, array in part.items()})
+        return write_arrays(path, {"fingerprint": self.fingerprint}, arrays, CH_MAGIC, CH_VERSION)
+
+    @classmethod
+    def load(cls, path: str) -> "ContractionHierarchy":
+        """Hierarchy saved by save(); arrays stay memory-mapped. Raises ValueError for other files"""
+        loaded = read_arrays(path, CH_MAGIC, CH_VERSION, kind="contraction hierarchy")
+        parts = {prefix: {name[len(prefix) + 1:]: array for name, array in loaded.arrays.items()
+                          if name.startswith(prefix + "_")} for prefix in ("up", "down")}
+        return cls(loaded.arrays["rank"], parts["up"], parts["down"], loaded.meta["fingerprint"])
+
+    def query(self, source: int, target: int) -> Tuple[Optional[List[Edge]], Tuple[int, int, int]]:
+        """Original edges of a shortest source -> target path (None when unreachable), plus the
+        search work as (haltes expanded, heap pushes, entries left queued)
+
+        Two upward Dijkstra searches with stall-on-demand; each stops once
+        its queue top reaches the best meeting distance found so far.
+        """
+        inf = float('inf')
+        adjacency = (self._up, self._down)
+        distances = ({source: 0.0}, {target: 0.0})
+        parents: Tuple[Dict[int, Tuple[int, int]], ...] = ({}, {})  # halte -> (previous halte, slot)
+        queues = ([(0.0, source)], [(0.0, target)])
+        settled = (set(), set())
+        pushes = 2
+        abandoned = 0  # entries dropped unpopped when a side stops
+        best, meet = (0.0, source) if source == target else (inf, None)
+        while queues[0] or queues[1]:
+            if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            distance, node = heapq.heappop(queues[side])
+            if distance >= best:
+                abandoned += len(queues[side])
+                queues[side].clear()
+                continue
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+            other = distances[1 - side].get(node)
+            if other is not None and distance + other < best:
+                best, meet = distance + other, node
+            distance_of, parent_of = distances[side], parents[side]
+            # Stall on demand: a higher-ranked halte reaches this one cheaper, so no shortest path climbs from it
+            offsets, targets, weights = adjacency[1 - side][:3]
+            if any(distance_of.get(targets[slot], inf) + weights[slot] < distance
+                   for slot in range(offsets[node], offsets[node + 1])):
+                continue
+            offsets, targets, weights = adjacency[side][:3]
+            for slot in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[slot]
+                candidate = distance + weights[slot]
+                if candidate < distance_of.get(neighbor, inf):
+                    distance_of[neighbor] = candidate
+                    parent_of[neighbor] = (node, slot)
+                    heapq.heappush(queues[side], (candidate, neighbor))
+                    pushes += 1
+        work = (len(settled[0]) + len(settled[1]), pushes, abandoned)
+        if meet is None:
+            return None, work
+        # Up from the source to the meeting halte, then back down to the target
+        arcs = []
+        node = meet
+        while node != source:
+            previous, slot = parents[0][node]
+            arcs.append((previous, node, "up", slot))
+            node = previous
+        arcs.reverse()
+        node = meet
+        while node != target:
+            following, slot = parents[1][node]
+            arcs.append((node, following, "down", slot))
+            node = following
+        edges: List[Edge] = []
+        for tail, head, part, slot in arcs:
+            self._unpack(tail, head, self._up if part == "up" else self._down, slot, edges)
+        return edges, work
+
+    def _unpack(self, tail: int, head: int, part: Tuple[Sequence, ...], slot: int, edges: List[Edge]) -> None:
+        """Append the original edges behind one stored edge tail -> head to edges"""
+        _, _, weights, middles, route_ids = part
+        middle = middles[slot]
+        if middle < 0:
+            edges.append((tail, head, route_ids[slot], weights[slot]))
+            return
+        # middle ranks below both ends: tail -> middle sits in down[middle], middle -> head in up[middle]
+        self._unpack(tail, middle, self._down, self._slot(self._down, middle, tail), edges)
+        self._unpack(middle, head, self._up, self._slot(self._up, middle, head), edges)
+
+    @staticmethod
+    def _slot(part: Tuple[Sequence, ...], node: int, neighbor: int) -> int:
+        offsets, targets = part[0], part[1]
+        start = offsets[node]
+        return start + targets[start:offsets[node + 1]].tolist().index(neighbor)
+
+
+def main():
+    from ai import BusRouteSystem
+
+    parser = argparse.ArgumentParser(description="Praproses Contraction Hierarchies untuk mesin rute engine=\"ch\"")
+    parser.add_argument("keluaran", help="file hierarki, misalnya jaringan.ch")
+    parser.add_argument("--snapshot", help="bangun dari snapshot jaringan (default: jaringan bawaan)")
+    args = parser.parse_args()
+
+    bus_system = BusRouteSystem.from_snapshot(args.snapshot) if args.snapshot else BusRouteSystem()
+    started = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(bus_system.compact_graph)
+    path = hierarchy.save(args.keluaran)
+    print(f"✅ {hierarchy.node_count} halte dikontraksi, {hierarchy.shortcut_count} jalan pintas, "
+          f"{time.perf_counter() - started:.1f} dtk; disimpan sebagai '{path}'")
+
+
+if __name__ == "__main__":
+    main()
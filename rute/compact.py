@@ -0,0 +1,74 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class CompactGraph:
+    """Integer-indexed adjacency in CSR form
+
+    The out-edges of node i are the slots offsets[i]:offsets[i + 1] of
+    targets, weights and route_ids. The NumPy arrays are the canonical
+    storage; the *_list attributes are memoryviews of them used by the
+    search loops. Indexing a memoryview gives plain Python numbers, nearly
+    as cheap as a list and much cheaper than a NumPy scalar, without
+    copying the arrays: a memory-mapped snapshot stays shared between
+    processes.
+    """
+
+    __slots__ = (
+        "offsets", "targets", "weights", "route_ids", "route_names",
+        "offsets_list", "targets_list", "weights_list", "route_ids_list",
+    )
+
+    def __init__(self, offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                 route_ids: np.ndarray, route_names: Sequence[str]):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.route_ids = route_ids
+        self.route_names = list(route_names)
+        self.offsets_list: Sequence[int] = memoryview(np.ascontiguousarray(offsets))
+        self.targets_list: Sequence[int] = memoryview(np.ascontiguousarray(targets))
+        self.weights_list: Sequence[float] = memoryview(np.ascontiguousarray(weights))
+        self.route_ids_list: Sequence[int] = memoryview(np.ascontiguousarray(route_ids))
+
+    @classmethod
+    def from_edges(cls, node_count: int, sources, targets, weights, route_ids,
+                   route_names: Sequence[str]) -> "CompactGraph":
+        """Build from parallel edge arrays; edges keep their input order within each source"""
+        sources = np.asarray(sources, dtype=np.int32)
+        order = np.argsort(sources, kind="stable")
+        counts = np.bincount(sources, minlength=node_count)
+        offsets = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            offsets,
+            np.asarray(targets, dtype=np.int32)[order],
+            np.asarray(weights, dtype=np.float64)[order],
+            np.asarray(route_ids, dtype=np.int32)[order],
+            route_names,
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def reversed(self) -> "CompactGraph":
+        sources = np.repeat(np.arange(self.node_count, dtype=np.int32), np.diff(self.offsets))
+        return CompactGraph.from_edges(self.node_count, self.targets, sources, self.weights,
+                                       self.route_ids, self.route_names)
+
+    def edges(self, node: int) -> List[Tuple[int, float, int]]:
+        start, end = self.offsets_list[node], self.offsets_list[node + 1]
+        return list(zip(self.targets_list[start:end], self.weights_list[start:end], self.route_ids_list[start:end]))
+
+    def to_dict(self, node_ids: Sequence[str]) -> Dict[str, List[Tuple[str, float, str]]]:
+        """Expand back to the {halte_id: [(neighbor_id, distance, route), ...]} form"""
+        return {
+            node_ids[node]: [(node_ids[t], w, self.route_names[r]) for t, w, r in self.edges(node)]
+            for node in range(self.node_count)
+        }
@@ -0,0 +1,196 @@
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Synthetic service used when no real timetable is loaded
+SERVICE_START = 5 * 3600   # first departure, seconds after midnight
+SERVICE_END = 22 * 3600    # no trips depart later than this
+DEFAULT_HEADWAY = 15 * 60  # seconds between consecutive trips of a route
+BUS_SPEED_KMH = 30.0
+TRANSFER_SECONDS = 60      # minimum time to change buses at a halte
+MAX_SERVICE_SECONDS = 48 * 3600  # times of day run past midnight for late trips, up to this bound
+# Largest timetable scanned from Python lists (~200 bytes per connection); bigger ones use compact arrays
+LIST_SCAN_LIMIT = 2_000_000
+# Timetable arrays in scan order, all a timetable needs to be rebuilt without sorting (see Timetable.from_sorted)
+SORTED_ARRAYS = ("dep_stop", "arr_stop", "dep_time", "arr_time", "trip", "next_in_trip")
+
+
+def seconds_of_day(value: Union[int, str, time, datetime]) -> int:
+    """Seconds after midnight for an int, "HH:MM[:SS]" string, time or datetime
+
+    Hours may run past 24 for service after midnight, as in GTFS, but not
+    to MAX_SERVICE_SECONDS; anything else out of range raises ValueError.
+    """
+    if isinstance(value, (int, np.integer)):
+        seconds = int(value)
+    elif isinstance(value, (datetime, time)):
+        return value.hour * 3600 + value.minute * 60 + value.second
+    else:
+        parts = [part.strip() for part in str(value).split(":")]
+        if not 2 <= len(parts) <= 3 or not all(part.isascii() and part.isdigit() for part in parts):
+            raise ValueError(f"Invalid time of day: {value!r}")
+        hours, minutes, seconds = [int(part) for part in parts] + [0] * (3 - len(parts))
+        if minutes >= 60 or seconds >= 60:
+            raise ValueError(f"Invalid time of day: {value!r}")
+        seconds += hours * 3600 + minutes * 60
+    if not 0 <= seconds < MAX_SERVICE_SECONDS:
+        raise ValueError(f"Time of day out of range: {value!r}")
+    return seconds
+
+
+def format_time(seconds: int) -> str:
+    """HH:MM clock time for seconds after midnight (times past midnight wrap around)"""
+    minutes = int(seconds) // 60
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+@dataclass
+class Ride:
+    """One leg of a timetabled journey: a trip ridden from its boarding to its alighting halte"""
+    route: str
+    stops: List[int]  # halte indices from boarding to alighting
+    times: List[int]  # departure at stops[0], then arrival at every later stop, in seconds
+
+    @property
+    def departure(self) -> int:
+        return self.times[0]
+
+    @property
+    def arrival(self) -> int:
+        return self.times[-1]
+
+
+class Timetable:
+    """Elementary connections (one trip between two consecutive haltes) sorted by departure time
+
+    Parallel int32 arrays with times in seconds after midnight; trip_routes
+    gives the route name of every trip number. Queries use the Connection
+    Scan Algorithm: one forward pass over the connections departing after
+    the requested time, stopping once they depart after the best arrival.
+    """
+
+    def __init__(self, dep_stop, arr_stop, dep_time, arr_time, trip, trip_routes: Sequence[str], stop_count: int):
+        order = np.lexsort((arr_time, dep_time))
+        self.dep_stop = np.asarray(dep_stop, dtype=np.int32)[order]
+        self.arr_stop = np.asarray(arr_stop, dtype=np.int32)[order]
+        self.dep_time = np.asarray(dep_time, dtype=np.int32)[order]
+        self.arr_time = np.asarray(arr_time, dtype=np.int32)[order]
+        self.trip = np.asarray(trip, dtype=np.int32)[order]
+        self.trip_routes = list(trip_routes)
+        self.stop_count = stop_count
+        # Next connection of the same trip, for walking a ride back from its first connection
+        self.next_in_trip = np.full(len(self.trip), -1, dtype=np.int64)
+        by_trip = np.lexsort((self.dep_time, self.trip))
+        same_trip = self.trip[by_trip[:-1]] == self.trip[by_trip[1:]]
+        self.next_in_trip[by_trip[:-1][same_trip]] = by_trip[1:][same_trip]
+        # Python lists for the scan loop; scalar numpy indexing is several times slower. Lists of
+        # millions of connections take gigabytes, so large timetables scan array.array copies instead
+        if len(self.trip) <= LIST_SCAN_LIMIT:
+            scan_copy = np.ndarray.tolist
+        else:
+            scan_copy = lambda values: array(values.dtype.char, values.tobytes())
+        self._dep_stop = scan_copy(self.dep_stop)
+        self._arr_stop = scan_copy(self.arr_stop)
+        self._dep_time = scan_copy(self.dep_time)
+        self._arr_time = scan_copy(self.arr_time)
+        self._trip = scan_copy(self.trip)
+        self._next_in_trip = scan_copy(self.next_in_trip)
+
+    @classmethod
+    def from_sorted(cls, arrays: Dict[str, np.ndarray], trip_routes: Sequence[str], stop_count: int) -> "Timetable":
+        """A timetable from the sorted arrays of another one (SORTED_ARRAYS, as a snapshot stores them)
+
+        Nothing is sorted or copied: the scan runs over memoryviews of the
+        arrays, so a memory-mapped snapshot stays shared between processes.
+        """
+        timetable = cls.__new__(cls)
+        for name in SORTED_ARRAYS:
+            setattr(timetable, name, arrays[name])
+            setattr(timetable, f"_{name}", memoryview(np.ascontiguousarray(arrays[name])))
+        timetable.trip_routes = list(trip_routes)
+        timetable.stop_count = stop_count
+        return timetable
+
+    @classmethod
+    def from_sequences(cls, route_sequences: Dict[str, Sequence[int]], halte_distances: np.ndarray,
+                       headway: int = DEFAULT_HEADWAY, start: int = SERVICE_START, end: int = SERVICE_END,
+                       speed_kmh: float = BUS_SPEED_KMH) -> "Timetable":
+        """A full-day timetable: every route runs both directions from start to end every headway seconds"""
+        first_departures = np.arange(start, end + 1, headway)
+        columns = {name: [] for name in ("dep_stop", "arr_stop", "dep_time", "arr_time", "trip")}
+        trip_routes: List[str] = []
+        for route, stops in route_sequences.items():
+            for direction in (list(stops), list(reversed(stops))):
+                if len(direction) < 2:
+                    continue
+                segments = halte_distances[direction[:-1], direction[1:]]
+                offsets = np.round(np.concatenate(([0.0], np.cumsum(segments))) / speed_kmh * 3600).astype(np.int64)
+                trips = len(trip_routes) + np.arange(len(first_departures))
+                trip_routes.extend([route] * len(first_departures))
+                columns["dep_stop"].append(np.tile(direction[:-1], len(first_departures)))
+                columns["arr_stop"].append(np.tile(direction[1:], len(first_departures)))
+                columns["dep_time"].append((first_departures[:, None] + offsets[None, :-1]).ravel())
+                columns["arr_time"].append((first_departures[:, None] + offsets[None, 1:]).ravel())
+                columns["trip"].append(np.repeat(trips, len(direction) - 1))
+        arrays = {name: np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+                  for name, parts in columns.items()}
+        return cls(trip_routes=trip_routes, stop_count=len(halte_distances), **arrays)
+
+    @classmethod
+    def from_stop_events(cls, trip, stop, arrival, departure, trip_routes: Sequence[str], stop_count: int) -> "Timetable":
+        """Connections between consecutive events of each trip; events must be grouped by trip in ride order"""
+        trip, stop = np.asarray(trip), np.asarray(stop)
+        arrival, departure = np.asarray(arrival), np.asarray(departure)
+        same_trip = trip[:-1] == trip[1:]
+        return cls(stop[:-1][same_trip], stop[1:][same_trip], departure[:-1][same_trip],
+                   arrival[1:][same_trip], trip[:-1][same_trip], trip_routes, stop_count)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._trip)
+
+    def earliest_arrival(self, source: int, target: int, departure: int,
+                         transfer_seconds: int = TRANSFER_SECONDS) -> Optional[List[Ride]]:
+        """Rides of the earliest-arriving journey leaving source at or after departure, or None"""
+        inf = float('inf')
+        dep_stop, arr_stop = self._dep_stop, self._arr_stop
+        dep_time, arr_time, trips = self._dep_time, self._arr_time, self._trip
+        arrival = [inf] * self.stop_count
+        ready = [inf] * self.stop_count  # earliest time a new trip may be boarded, after changing buses
+        arrival[source] = ready[source] = departure
+        boarded: Dict[int, int] = {}     # trip -> connection where it was boarded
+        reached_by: Dict[int, Tuple[int, int]] = {}  # halte -> (boarding connection, alighting connection)
+        for i in range(bisect_left(dep_time, departure), len(trips)):
+            depart = dep_time[i]
+            if depart >= arrival[target]:
+                break
+            trip = trips[i]
+            if trip in boarded or ready[dep_stop[i]] <= depart:
+                enter = boarded.setdefault(trip, i)
+                stop = arr_stop[i]
+                if arr_time[i] < arrival[stop]:
+                    arrival[stop] = arr_time[i]
+                    ready[stop] = arr_time[i] + transfer_seconds
+                    reached_by[stop] = (enter, i)
+        if source == target or target not in reached_by:
+            return None
+        rides = []
+        stop = target
+        while stop != source:
+            enter, exit = reached_by[stop]
+            stops, times = [dep_stop[enter]], [dep_time[enter]]
+            i = enter
+            while True:
+                stops.append(arr_stop[i])
+                times.append(arr_time[i])
+                if i == exit:
+                    break
+                i = self._next_in_trip[i]
+            rides.append(Ride(self.trip_routes[trips[enter]], stops, times))
+            stop = stops[0]
+        rides.reverse()
+        return rides
@@ -0,0 +1,52 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distances in km between every point of the first set and every point of the second set"""
+    lat1 = np.radians(np.asarray(lat1, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(lon1, dtype=np.float64))[:, None]
+    lat2 = np.radians(np.asarray(lat2, dtype=np.float64))[None, :]
+    lon2 = np.radians(np.asarray(lon2, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_pairs(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Element-wise distances in km between two equally long coordinate arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class HaversineDistances:
+    """Distances between two point sets computed on demand instead of stored
+
+    Indexes like the dense haversine_matrix result for the access patterns the
+    routing code uses: [rows, cols] pairs, [i, j], [i] rows and [:, j] columns.
+    Used for networks where an N x N matrix would not fit in memory.
+    """
+
+    def __init__(self, lat1, lon1, lat2, lon2):
+        self.lat1 = np.asarray(lat1, dtype=np.float64)
+        self.lon1 = np.asarray(lon1, dtype=np.float64)
+        self.lat2 = np.asarray(lat2, dtype=np.float64)
+        self.lon2 = np.asarray(lon2, dtype=np.float64)
+        self.shape = (len(self.lat1), len(self.lat2))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key) -> np.ndarray:
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(rows, slice) and isinstance(cols, slice):
+            return haversine_matrix(self.lat1[rows], self.lon1[rows], self.lat2[cols], self.lon2[cols])
+        return haversine_pairs(self.lat1[rows], self.lon1[rows], self.lat2[cols], self.lon2[cols])
+
+
+def distance_table(lat1, lon1, lat2, lon2, dense_limit: int):
+    """Dense haversine_matrix when it has at most dense_limit cells, otherwise HaversineDistances"""
+    if len(lat1) * len(lat2) <= dense_limit:
+        return haversine_matrix(lat1, lon1, lat2, lon2)
+    return HaversineDistances(lat1, lon1, lat2, lon2)
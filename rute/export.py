@@ -0,0 +1,76 @@
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from ai import HALTE_DATA, BusRouteSystem
+from snapshot import load_snapshot
+
+# One routing system per worker process, built by _init_worker
+_worker_system: Optional[BusRouteSystem] = None
+
+
+def _init_worker(snapshot_path: Optional[str] = None) -> None:
+    global _worker_system
+    _worker_system = BusRouteSystem.from_snapshot(snapshot_path) if snapshot_path else BusRouteSystem()
+    _worker_system.base_map_html()  # build the cached base layer once per process
+
+
+def _export_one(job: Tuple[str, str, str]) -> Tuple[str, str, Optional[str]]:
+    start_id, end_id, output_path = job
+    route = _worker_system.find_route(start_id, end_id)
+    if not route:
+        return start_id, end_id, None
+    return start_id, end_id, _worker_system.save_map(output_path, route["path"])
+
+
+def export_route_maps(pairs: Iterable[Tuple[str, str]], output_dir: str,
+                      processes: Optional[int] = None, chunksize: int = 16,
+                      snapshot_path: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """Render one map per (start, end) pair into output_dir using a process pool
+
+    Files are named <start>_<end>.html. Returns (start, end, path) in input
+    order, with path None when no route exists. With snapshot_path every
+    worker maps the same compiled network instead of rebuilding it.
+    """
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(start_id, end_id, os.path.join(output_dir, f"{start_id}_{end_id}.html")) for start_id, end_id in pairs]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(snapshot_path,)) as pool:
+        return list(pool.map(_export_one, jobs, chunksize=chunksize))
+
+
+def read_pairs(csv_path: str) -> List[Tuple[str, str]]:
+    """(start, end) halte ID pairs from the first two columns of a CSV file"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2]
+
+
+def all_pairs(snapshot_path: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Every ordered pair of distinct haltes, of the snapshot's network when given, else the built-in one"""
+    halte_data = load_snapshot(snapshot_path).meta["halte_data"] if snapshot_path else HALTE_DATA
+    ids = [halte["id"] for halte in halte_data]
+    return [(start_id, end_id) for start_id in ids for end_id in ids if start_id != end_id]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor peta rute untuk banyak pasangan halte secara paralel")
+    parser.add_argument("keluaran", help="folder tujuan file HTML")
+    parser.add_argument("--pasangan", help="file CSV berisi halte_awal,halte_tujuan (default: semua pasangan)")
+    parser.add_argument("--proses", type=int, default=None, help="jumlah proses (default: jumlah core)")
+    parser.add_argument("--snapshot", help="file snapshot jaringan hasil snapshot.py")
+    args = parser.parse_args()
+
+    pairs = read_pairs(args.pasangan) if args.pasangan else all_pairs(args.snapshot)
+    results = export_route_maps(pairs, args.keluaran, processes=args.proses,
+                                snapshot_path=args.snapshot)
+    exported = sum(1 for _, _, path in results if path)
+    print(f"✅ {exported} peta rute disimpan di '{os.path.abspath(args.keluaran)}'")
+    if exported < len(results):
+        print(f"❌ {len(results) - exported} pasangan tanpa rute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import csv
+import functools
+import io
+import os
+import sys
+import zipfile
+from array import array
+from itertools import cycle
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai import BusRouteSystem, ROUTE_COLORS
+from csa import Timetable, seconds_of_day
+from snapshot import file_fingerprint
+from spatial import GridIndex
+
+COLLAPSED_LISTED = 5  # routes named in the summary of merged stop patterns
+
+
+def _read_columns(f, table: str, columns: Sequence[str], optional: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+    reader = csv.reader(f)
+    header = [name.strip() for name in next(reader, [])]
+    positions = []
+    for name in list(columns) + list(optional):
+        if name in header:
+            positions.append(header.index(name))
+        elif name in columns:
+            raise ValueError(f"GTFS table {table} has no column '{name}'")
+        else:
+            positions.append(None)
+    for row in reader:
+        if row:
+            yield tuple(row[p].strip() if p is not None and p < len(row) else "" for p in positions)
+
+
+def _rows(feed_path: str, table: str, columns: Sequence[str], optional: Sequence[str] = (),
+          required: bool = True) -> Iterator[Tuple[str, ...]]:
+    """Stream the given columns of one feed table (directory or .zip) as tuples, one row at a time
+
+    Absent optional columns read as ''. A missing table raises FileNotFoundError
+    unless required is False, in which case it yields nothing.
+    """
+    if zipfile.is_zipfile(feed_path):
+        with zipfile.ZipFile(feed_path) as archive:
+            if table not in archive.namelist():
+                if required:
+                    raise FileNotFoundError(f"GTFS feed {feed_path} has no {table}")
+                return
+            with archive.open(table) as raw:
+                yield from _read_columns(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""), table, columns, optional)
+    else:
+        path = os.path.join(feed_path, table)
+        if not os.path.exists(path):
+            if required:
+                raise FileNotFoundError(f"GTFS feed {feed_path} has no {table}")
+            return
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            yield from _read_columns(f, table, columns, optional)
+
+
+def _is_stretch(part: Sequence[int], stops: Sequence[int]) -> bool:
+    """Whether part occurs in stops as consecutive stops"""
+    width = len(part)
+    return any(stops[i:i + width] == part for i in range(len(stops) - width + 1))
+
+
+def read_gtfs(feed_path: str) -> Dict:
+    """BusRouteSystem keyword arguments (halte_data, route_sequences, route_colors, route_shapes, timetable) from a GTFS feed
+
+    Every table is streamed row by row. stop_times.txt is expected grouped by
+    trip_id, as feeds are published; only the current trip and the distinct
+    stop patterns of each route are held in memory. The longest pattern of a
+    route becomes its sequence, and every other pattern becomes its own
+    "<route>-<n>" sequence unless it is a stretch of a kept one (in either
+    direction), which adds no halte or connection; those are counted in a
+    printed summary. Only stops served by an imported sequence become
+    haltes. Timed stop events are kept in flat int arrays and become the
+    timetable; untimed stops are ridden through, and each trip is reported
+    under the sequence that covers its pattern.
+    """
+    stop_index: Dict[str, int] = {}
+    stop_ids: List[str] = []
+    stop_names: List[str] = []
+    stop_lat, stop_lon = array("d"), array("d")
+    for stop_id, name, lat, lon, location_type in _rows(
+            feed_path, "stops.txt", ("stop_id", "stop_name", "stop_lat", "stop_lon"), ("location_type",)):
+        if location_type not in ("", "0"):
+            continue  # stations, entrances and nodes are not boarding points
+        stop_index[stop_id] = len(stop_ids)
+        stop_ids.append(stop_id)
+        stop_names.append(name)
+        stop_lat.append(float(lat))
+        stop_lon.append(float(lon))
+
+    route_index: Dict[str, int] = {}
+    route_names: List[str] = []
+    route_colors: List[str] = []
+    used_names = set()
+    for route_id, short_name, long_name, color in _rows(
+            feed_path, "routes.txt", ("route_id",), ("route_short_name", "route_long_name", "route_color")):
+        name = short_name or long_name or route_id
+        if name in used_names:
+            name = route_id
+        used_names.add(name)
+        route_index[route_id] = len(route_names)
+        route_names.append(name)
+        route_colors.append(f"#{color.upper()}" if color else "")
+
+    # trip -> (route, shape); route and shape numbers stay small ints
+    shape_index: Dict[str, int] = {}
+    trip_keys: Dict[str, Tuple[int, int]] = {}
+    for trip_id, route_id, shape_id in _rows(feed_path, "trips.txt", ("trip_id", "route_id"), ("shape_id",)):
+        if route_id not in route_index:
+            continue
+        shape = shape_index.setdefault(shape_id, len(shape_index)) if shape_id else -1
+        trip_keys[trip_id] = (route_index[route_id], shape)
+
+    # Distinct stop patterns: (route, stops) -> pattern number, with the shape and trip count of each
+    pattern_index: Dict[Tuple[int, Tuple[int, ...]], int] = {}
+    pattern_shapes: List[int] = []
+    pattern_trips: List[int] = []
+    # Timed stop events of every trip, grouped by trip in ride order
+    event_trip, event_stop, event_arrival, event_departure = array("i"), array("i"), array("i"), array("i")
+    trip_patterns = array("i")
+    clock = functools.lru_cache(maxsize=4096)(seconds_of_day)  # feeds repeat the same clock times
+
+    def finish_trip(trip_id: str, stop_times: List[Tuple[int, int, str, str]]) -> None:
+        route, shape = trip_keys[trip_id]
+        stop_times.sort()
+        stops = []
+        trip = len(trip_patterns)
+        for _, stop, arrival, departure in stop_times:
+            if not stops or stops[-1] != stop:
+                stops.append(stop)
+            if arrival or departure:
+                event_trip.append(trip)
+                event_stop.append(stop)
+                event_arrival.append(clock(arrival or departure))
+                event_departure.append(clock(departure or arrival))
+        if len(stops) < 2:
+            trip_patterns.append(-1)
+            return
+        pattern = pattern_index.setdefault((route, tuple(stops)), len(pattern_index))
+        if pattern == len(pattern_shapes):
+            pattern_shapes.append(shape)
+            pattern_trips.append(0)
+        pattern_trips[pattern] += 1
+        trip_patterns.append(pattern)
+
+    current_trip, current = None, []
+    for trip_id, stop_id, stop_sequence, arrival, departure in _rows(
+            feed_path, "stop_times.txt", ("trip_id", "stop_id", "stop_sequence"), ("arrival_time", "departure_time")):
+        if trip_id != current_trip:
+            if current:
+                finish_trip(current_trip, current)
+            current_trip, current = trip_id, []
+        if trip_id in trip_keys and stop_id in stop_index:
+            current.append((int(stop_sequence), stop_index[stop_id], arrival, departure))
+    if current:
+        finish_trip(current_trip, current)
+
+    sequences: Dict[str, Tuple[int, ...]] = {}
+    colors: Dict[str, str] = {}
+    shapes_wanted: Dict[int, str] = {}
+    pattern_names: Dict[int, str] = {}  # pattern number -> sequence its trips are reported under
+    by_route: Dict[int, List[Tuple[Tuple[int, ...], int]]] = {}
+    for (route, stops), pattern in pattern_index.items():
+        by_route.setdefault(route, []).append((stops, pattern))
+    collapsed: Dict[str, int] = {}
+    palette = cycle(ROUTE_COLORS.values())
+    for route in sorted(by_route):
+        name = route_names[route]
+        color = route_colors[route] or next(palette)
+        kept: List[Tuple[str, Tuple[int, ...]]] = []
+        # Longest and most used first, so variants are matched against the main line
+        for stops, pattern in sorted(by_route[route], key=lambda item: (-len(item[0]), -pattern_trips[item[1]], item[1])):
+            cover = next((sequence_name for sequence_name, kept_stops in kept
+                          if _is_stretch(stops, kept_stops) or _is_stretch(stops, kept_stops[::-1])), None)
+            if cover is not None:
+                pattern_names[pattern] = cover
+                collapsed[name] = collapsed.get(name, 0) + 1
+                continue
+            sequence_name = f"{name}-{len(kept)}" if kept else name
+            kept.append((sequence_name, stops))
+            pattern_names[pattern] = sequence_name
+            sequences[sequence_name] = stops
+            colors[sequence_name] = color
+            if pattern_shapes[pattern] >= 0:
+                shapes_wanted.setdefault(pattern_shapes[pattern], sequence_name)
+    if collapsed:
+        listed = [f"{name} ({count})" for name, count in list(collapsed.items())[:COLLAPSED_LISTED]]
+        if len(collapsed) > COLLAPSED_LISTED:
+            listed.append(f"dan {len(collapsed) - COLLAPSED_LISTED} rute lain")
+        print(f"ℹ️  {sum(collapsed.values())} pola perjalanan tercakup pola lain dari rute yang sama "
+              f"(termasuk arah sebaliknya) dan digabungkan: {', '.join(listed)}")
+
+    shape_points: Dict[int, List[Tuple[int, float, float]]] = {shape: [] for shape in shapes_wanted}
+    for shape_id, lat, lon, sequence in _rows(
+            feed_path, "shapes.txt", ("shape_id", "shape_pt_lat", "shape_pt_lon", "shape_pt_sequence"), required=False):
+        shape = shape_index.get(shape_id)
+        if shape in shape_points:
+            shape_points[shape].append((int(sequence), float(lat), float(lon)))
+    route_shapes = {
+        shapes_wanted[shape]: [[lat, lon] for _, lat, lon in sorted(points)]
+        for shape, points in shape_points.items() if len(points) > 1
+    }
+
+    served = sorted({stop for stops in sequences.values() for stop in stops})
+    halte_data = [
+        {"id": stop_ids[i], "name": stop_names[i], "lat": stop_lat[i], "lon": stop_lon[i], "routes": []}
+        for i in served
+    ]
+    halte_by_stop = dict(zip(served, halte_data))
+    route_sequences = {}
+    for sequence_name, stops in sequences.items():
+        route_sequences[sequence_name] = [stop_ids[stop] for stop in stops]
+        for stop in dict.fromkeys(stops):
+            halte_by_stop[stop]["routes"].append(sequence_name)
+
+    halte_numbers = np.full(len(stop_ids), -1, dtype=np.int64)
+    halte_numbers[served] = np.arange(len(served))
+    event_halte = halte_numbers[np.asarray(event_stop, dtype=np.intp)]
+    on_network = event_halte >= 0
+    timetable = Timetable.from_stop_events(
+        np.asarray(event_trip)[on_network], event_halte[on_network],
+        np.asarray(event_arrival)[on_network], np.asarray(event_departure)[on_network],
+        [pattern_names.get(pattern, "") for pattern in trip_patterns], len(served)
+    )
+    return {"halte_data": halte_data, "route_sequences": route_sequences,
+            "route_colors": colors, "route_shapes": route_shapes, "timetable": timetable}
+
+
+def _link_wisata(wisata_data: List[Dict], halte_data: List[Dict]) -> List[Dict]:
+    """Copies of the wisata records whose "halte" points at the nearest imported stop"""
+    spatial = GridIndex([h["lat"] for h in halte_data], [h["lon"] for h in halte_data])
+    linked = []
+    for wisata in wisata_data:
+        indices, _ = spatial.nearest(wisata["lat"], wisata["lon"], k=1)
+        linked.append(dict(wisata, halte=[halte_data[i]["id"] for i in indices]))
+    return linked
+
+
+def load_gtfs(feed_path: str, wisata_data: Optional[List[Dict]] = None, **kwargs) -> BusRouteSystem:
+    """BusRouteSystem for a GTFS feed directory or .zip
+
+    wisata_data records (default: none) are re-linked to their nearest imported
+    stop; other keyword arguments go to BusRouteSystem.
+    """
+    network = read_gtfs(feed_path)
+    if not network["halte_data"]:
+        raise ValueError(f"GTFS feed {feed_path} has no trips with at least two stops")
+    wisata = _link_wisata(wisata_data, network["halte_data"]) if wisata_data else []
+    return BusRouteSystem(wisata_data=wisata, **network, **kwargs)
+
+
+def feed_source(feed_path: str) -> Dict:
+    """Snapshot source record of a GTFS feed (see snapshot.compile_snapshot)"""
+    return {"kind": "gtfs", "path": os.path.abspath(feed_path), "fingerprint": file_fingerprint(feed_path)}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Pemakaian: python gtfs.py <folder-atau-zip-gtfs> [snapshot-keluaran]")
+        return
+    bus_system = load_gtfs(sys.argv[1])
+    print(f"✅ {len(bus_system.halte_data)} halte dan {len(bus_system.route_sequences)} rute dimuat dari '{sys.argv[1]}'")
+    if len(sys.argv) > 2:
+        from snapshot import compile_snapshot
+        path = compile_snapshot(bus_system, sys.argv[2], feed_source(sys.argv[1]))
+        print(f"✅ Snapshot jaringan disimpan sebagai '{path}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import re
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from csa import seconds_of_day
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Monday is day 0, as in datetime.weekday(); English and Indonesian abbreviations
+DAY_NAMES = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6,
+             "sen": 0, "sel": 1, "rab": 2, "kam": 3, "jum": 4, "sab": 5, "min": 6}
+WEEKDAYS = range(0, 5)
+WEEKEND = range(5, 7)
+
+_ALWAYS_OPEN = re.compile(r"24\s*(jam|hours?|h)\b", re.IGNORECASE)
+_TIME_RANGE = re.compile(r"(\d{1,2})[:.](\d{2})\s*-\s*(\d{1,2})[:.](\d{2})")
+_DAY_RANGE = re.compile(r"\b([a-z]{3})[a-z]*\s*(?:-\s*([a-z]{3})[a-z]*)?\b", re.IGNORECASE)
+_RUPIAH = re.compile(r"Rp\s*([\d.,]+)", re.IGNORECASE)
+_FREE = re.compile(r"\b(free|gratis)\b", re.IGNORECASE)
+
+Interval = Tuple[int, int]  # [start, end) in minutes after Monday 00:00
+
+
+def _days(text: str) -> Sequence[int]:
+    lowered = text.lower()
+    if "weekend" in lowered or "akhir pekan" in lowered:
+        return WEEKEND
+    if "weekday" in lowered or "hari kerja" in lowered:
+        return WEEKDAYS
+    for match in _DAY_RANGE.finditer(lowered):
+        first = DAY_NAMES.get(match.group(1))
+        if first is None:
+            continue
+        last = DAY_NAMES.get(match.group(2) or match.group(1), first)
+        return [(first + offset) % 7 for offset in range((last - first) % 7 + 1)]
+    return range(7)
+
+
+def parse_hours(text: str) -> Optional[List[Interval]]:
+    """Weekly opening intervals for texts like "08:30 - 16:30", "24 jam",
+    "09:00 - 18:00 (weekday), 08:00 - 18:00 (weekend)" or "Tue-Thu 13:00-15:00, Fri-Sun 10:00-15:00"
+
+    Returns None when the text cannot be understood. Overnight ranges run into
+    the next day.
+    """
+    if _ALWAYS_OPEN.search(text or ""):
+        return [(0, MINUTES_PER_WEEK)]
+    intervals: List[Interval] = []
+    for part in (text or "").split(","):
+        match = _TIME_RANGE.search(part)
+        if not match:
+            return None
+        start_h, start_m, end_h, end_m = (int(group) for group in match.groups())
+        start = start_h * 60 + start_m
+        end = end_h * 60 + end_m
+        if end <= start:
+            end += MINUTES_PER_DAY
+        for day in _days(part[:match.start()] + part[match.end():]):
+            begin = day * MINUTES_PER_DAY + start
+            finish = day * MINUTES_PER_DAY + end
+            if finish > MINUTES_PER_WEEK:  # Sunday night into Monday morning
+                intervals.append((0, finish - MINUTES_PER_WEEK))
+                finish = MINUTES_PER_WEEK
+            intervals.append((begin, finish))
+    return sorted(intervals) or None
+
+
+def parse_cost(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """(cheapest, most expensive) ticket in Rupiah; (0, 0) when free, (None, None) when unknown"""
+    amounts = [int(re.sub(r"[.,]", "", amount)) for amount in _RUPIAH.findall(text or "")]
+    if amounts:
+        return min(amounts), max(amounts)
+    if _FREE.search(text or ""):
+        return 0, 0
+    return None, None
+
+
+def minute_of_week(when: Union[datetime, time, str, int], offset_minutes: float = 0) -> int:
+    """Minutes after Monday 00:00 for a datetime, or for a clock time (time, "HH:MM", seconds) today"""
+    if isinstance(when, datetime):
+        day, seconds = when.weekday(), seconds_of_day(when)
+    else:
+        day, seconds = date.today().weekday(), seconds_of_day(when)
+    return int(day * MINUTES_PER_DAY + seconds // 60 + offset_minutes) % MINUTES_PER_WEEK
+
+
+class AttractionSchedule:
+    """Opening intervals and ticket prices of every wisata, parsed once at load time
+
+    Intervals are bucketed by hour of the week, so an "open at" query only
+    compares against the intervals that overlap its hour. Wisata whose hours
+    or cost could not be parsed are never filtered out on that criterion.
+    """
+
+    def __init__(self, wisata_data: List[Dict]):
+        self.intervals = [parse_hours(wisata.get("hours", "")) for wisata in wisata_data]
+        costs = [parse_cost(wisata.get("cost", "")) for wisata in wisata_data]
+        self.cost_min = np.array([np.nan if low is None else low for low, _ in costs], dtype=float)
+        self.cost_max = np.array([np.nan if high is None else high for _, high in costs], dtype=float)
+        self.unknown_hours = np.array([intervals is None for intervals in self.intervals], dtype=bool)
+        # Open whenever: unknown hours plus "24 jam" places, which stay out of the buckets
+        self._always = self.unknown_hours | np.array(
+            [intervals == [(0, MINUTES_PER_WEEK)] for intervals in self.intervals], dtype=bool)
+        buckets: List[List[Tuple[int, int, int]]] = [[] for _ in range(MINUTES_PER_WEEK // 60)]
+        for wisata_idx, intervals in enumerate(self.intervals):
+            if self._always[wisata_idx]:
+                continue
+            for start, end in intervals:
+                for hour in range(start // 60, (end - 1) // 60 + 1):
+                    buckets[hour].append((wisata_idx, start, end))
+        # Per hour: parallel arrays of (wisata index, interval start, interval end)
+        self._buckets = [np.array(bucket, dtype=np.int64).reshape(-1, 3) for bucket in buckets]
+
+    def open_mask(self, minute: int) -> np.ndarray:
+        """Boolean mask of the wisata open at the given minute of the week"""
+        bucket = self._buckets[minute // 60]
+        mask = self._always.copy()
+        hit = (bucket[:, 1] <= minute) & (minute < bucket[:, 2])
+        mask[bucket[hit, 0]] = True
+        return mask
+
+    def budget_mask(self, max_cost: float) -> np.ndarray:
+        """Boolean mask of the wisata whose cheapest ticket costs at most max_cost"""
+        return ~(self.cost_min > max_cost)
+
+    def mask(self, open_at=None, max_cost: Optional[float] = None) -> Optional[np.ndarray]:
+        """Combined filter for open_at (see minute_of_week) and max_cost, or None when neither is given"""
+        mask = None
+        if open_at is not None:
+            mask = self.open_mask(minute_of_week(open_at))
+        if max_cost is not None:
+            budget = self.budget_mask(max_cost)
+            mask = budget if mask is None else mask & budget
+        return mask
+
+    def is_open(self, wisata_idx: int, minute: int) -> Optional[bool]:
+        """Whether one wisata is open at minute of the week; None when its hours are unknown"""
+        if self.unknown_hours[wisata_idx]:
+            return None
+        return any(start <= minute < end for start, end in self.intervals[wisata_idx])
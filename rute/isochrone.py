@@ -0,0 +1,69 @@
+import math
+from typing import Dict, Sequence
+
+import numpy as np
+
+from spatial import KM_PER_DEGREE
+
+CIRCLE_SEGMENTS = 24  # vertices of each walking circle
+FILTER_DIRECTIONS = 32  # extreme points that bound the interior dropped before the hull is built
+
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """Vertices of the convex hull of an (n, 2) point array, counter-clockwise (Andrew's monotone chain)
+
+    Points strictly inside the polygon through the extreme points in
+    FILTER_DIRECTIONS directions cannot be hull vertices and are dropped
+    before sorting, which leaves little more than the outline.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) >= 3:
+        angles = np.arange(FILTER_DIRECTIONS) * (2 * math.pi / FILTER_DIRECTIONS)
+        extremes = np.argmax(points @ np.stack([np.cos(angles), np.sin(angles)]), axis=0)
+        extremes = [index for i, index in enumerate(extremes) if index != extremes[i - 1]]
+        if len(extremes) >= 3:
+            corners = points[extremes]
+            edges = np.roll(corners, -1, axis=0) - corners
+            inside = np.ones(len(points), dtype=bool)
+            for corner, edge in zip(corners, edges):
+                inside &= edge[0] * (points[:, 1] - corner[1]) - edge[1] * (points[:, 0] - corner[0]) > 0
+            points = points[~inside]
+    points = points[np.lexsort((points[:, 1], points[:, 0]))]
+    if len(points) > 1:
+        points = points[np.concatenate([[True], np.any(points[1:] != points[:-1], axis=1)])]
+    if len(points) < 3:
+        return points
+
+    def chain(ordered):
+        hull = []
+        for x, y in ordered:
+            while len(hull) >= 2 and ((hull[-1][0] - hull[-2][0]) * (y - hull[-2][1])
+                                      - (hull[-1][1] - hull[-2][1]) * (x - hull[-2][0])) <= 0:
+                hull.pop()
+            hull.append((x, y))
+        return hull
+
+    ordered = points.tolist()
+    lower, upper = chain(ordered), chain(reversed(ordered))
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def isochrone_polygon(lat: Sequence[float], lon: Sequence[float], radius_km: Sequence[float]) -> Dict:
+    """GeoJSON Polygon enclosing a circle of radius_km around every point
+
+    The outline is the convex hull of the circles, so it also covers gaps
+    between bus lines; the circles themselves are the exact reachable area.
+    """
+    lat = np.asarray(lat, dtype=np.float64)[:, None]
+    lon = np.asarray(lon, dtype=np.float64)[:, None]
+    radius = np.asarray(radius_km, dtype=np.float64)[:, None] / KM_PER_DEGREE
+    angles = np.linspace(0, 2 * math.pi, CIRCLE_SEGMENTS, endpoint=False)[None, :]
+    points = np.stack([
+        (lon + radius * np.cos(angles) / np.cos(np.radians(lat))).ravel(),
+        (lat + radius * np.sin(angles)).ravel(),
+    ], axis=1)
+    hull = convex_hull(points)
+    if len(hull) < 3:
+        return {"type": "Polygon", "coordinates": []}
+    ring = hull.tolist()
+    return {"type": "Polygon", "coordinates": [ring + ring[:1]]}
@@ -0,0 +1,130 @@
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Union
+
+import numpy as np
+
+from compact import CompactGraph
+
+
+def shortest_distances(graph: CompactGraph, source: int) -> np.ndarray:
+    """Dijkstra distances from source to every node, inf where unreachable"""
+    offsets, targets, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+    dist = [float('inf')] * graph.node_count
+    dist[source] = 0.0
+    settled = bytearray(graph.node_count)
+    open_set = [(0.0, source)]
+    while open_set:
+        d, node = heapq.heappop(open_set)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        for slot in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[slot]
+            nd = d + weights[slot]
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                heapq.heappush(open_set, (nd, neighbor))
+    return np.array(dist)
+
+
+# Extra per-node lower bound, or a function returning it
+Base = Union[np.ndarray, Callable[[], np.ndarray], None]
+
+
+class LandmarkHeuristic:
+    """ALT lower bounds from distances to and from a few landmark nodes
+
+    For a goal t the bound at v is max over landmarks L of
+    d(L, t) - d(L, v) and d(v, L) - d(t, L), combined with an optional
+    base bound (straight-line distance). Bounds are computed for all
+    nodes at once per goal and kept in a small LRU cache; a base given as
+    a function is only evaluated on a cache miss.
+    """
+
+    def __init__(self, graph: CompactGraph, count: int = 4, cache_size: int = 256):
+        self.size = graph.node_count
+        reverse = graph.reversed()
+        self.landmarks: List[int] = []
+        from_rows, to_rows = [], []
+        if self.size and count > 0:
+            # Farthest-point selection: start from an arbitrary node's farthest node,
+            # then keep adding the node farthest from all chosen landmarks
+            seed = shortest_distances(graph, 0)
+            coverage = np.where(np.isfinite(seed), seed, -1.0)
+            candidate = int(np.argmax(coverage))
+            nearest = None
+            while len(self.landmarks) < min(count, self.size):
+                self.landmarks.append(candidate)
+                from_row = shortest_distances(graph, candidate)
+                from_rows.append(from_row)
+                to_rows.append(shortest_distances(reverse, candidate))
+                reach = np.where(np.isfinite(from_row), from_row, np.inf)
+                nearest = reach if nearest is None else np.minimum(nearest, reach)
+                # Unreachable nodes are the best next landmark: they open a new component
+                scores = np.where(np.isfinite(nearest), nearest, np.finfo(np.float64).max)
+                scores[self.landmarks] = -1.0
+                candidate = int(np.argmax(scores))
+                if scores[candidate] <= 0:
+                    break
+        self.from_landmark = np.array(from_rows).reshape(len(from_rows), self.size)
+        self.to_landmark = np.array(to_rows).reshape(len(to_rows), self.size)
+        self._init_cache(cache_size)
+
+    @classmethod
+    def from_tables(cls, landmarks: List[int], from_landmark: np.ndarray, to_landmark: np.ndarray,
+                    cache_size: int = 256) -> "LandmarkHeuristic":
+        """Rebuild from stored distance tables (L x N) without rerunning the preprocessing"""
+        heuristic = cls.__new__(cls)
+        heuristic.size = from_landmark.shape[1]
+        heuristic.landmarks = list(landmarks)
+        heuristic.from_landmark = from_landmark
+        heuristic.to_landmark = to_landmark
+        heuristic._init_cache(cache_size)
+        return heuristic
+
+    def _init_cache(self, cache_size: int) -> None:
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def bounds_to(self, goal: int, base: Base = None) -> List[float]:
+        """Lower bound on the distance from every node to goal, as a plain list"""
+        return self._bounds(goal, goal, base, reverse=False)
+
+    def bounds_from(self, source: int, base: Base = None) -> List[float]:
+        """Lower bound on the distance from source to every node, as a plain list"""
+        # Cached next to the bounds_to lists under the complement of the node index
+        return self._bounds(~source, source, base, reverse=True)
+
+    def _bounds(self, key: int, node: int, base: Base, reverse: bool) -> List[float]:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        with np.errstate(invalid="ignore"):
+            # Triangle inequality through every landmark L, in both directions
+            if reverse:
+                forward = self.from_landmark - self.from_landmark[:, node][:, None]
+                backward = self.to_landmark[:, node][:, None] - self.to_landmark
+            else:
+                forward = self.from_landmark[:, node][:, None] - self.from_landmark
+                backward = self.to_landmark - self.to_landmark[:, node][:, None]
+            bounds = np.fmax.reduce(np.concatenate([forward, backward]), axis=0, initial=0.0)
+        if callable(base):
+            base = base()
+        if base is not None:
+            bounds = np.fmax(bounds, base)
+        bounds = np.nan_to_num(bounds, nan=0.0, posinf=np.inf)
+        result = bounds.tolist()
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
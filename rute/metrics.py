@@ -0,0 +1,109 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Histogram bucket upper bounds: wall time in seconds, search work in operations
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+SEARCH_COUNTERS = {
+    "nodes_expanded": "Haltes whose outgoing edges were relaxed",
+    "heap_pushes": "Entries pushed onto the priority queue",
+    "heap_pops": "Entries popped from the priority queue, stale ones included",
+    "heuristic_calls": "Lower-bound lookups made by A*",
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Observation counts per bucket, sum and count, as in the Prometheus data model"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: above every bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum!r}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class SearchMetrics:
+    """Per-query instrumentation aggregated per engine, rendered in the Prometheus text format
+
+    BusRouteSystem reports to it only after enable_metrics(); until then the
+    query paths skip instrumentation behind a single None check. Totals that
+    other objects already keep (cache hits) are read at render time through
+    collect() instead of being counted twice.
+    """
+
+    def __init__(self, prefix: str = "rute"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._query_seconds: Dict[str, Histogram] = {}
+        self._search: Dict[Tuple[str, str], Histogram] = {}
+        self._collectors: Dict[str, Tuple[str, List[Tuple[Dict[str, str], Callable[[], float]]]]] = {}
+
+    def observe_query(self, engine: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._query_seconds.get(engine)
+            if histogram is None:
+                histogram = self._query_seconds[engine] = Histogram(TIME_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_search(self, engine: str, **counts: int) -> None:
+        """Work done by one graph search, as keyword arguments named after SEARCH_COUNTERS"""
+        with self._lock:
+            for counter, value in counts.items():
+                histogram = self._search.get((counter, engine))
+                if histogram is None:
+                    histogram = self._search[(counter, engine)] = Histogram(COUNT_BUCKETS)
+                histogram.observe(value)
+
+    def collect(self, name: str, help_text: str, read: Callable[[], float], **labels: str) -> None:
+        """Counter `prefix_name` whose value is read() at render time; one call per label set"""
+        with self._lock:
+            _, series = self._collectors.setdefault(name, (help_text, []))
+            series.append((labels, read))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            if self._query_seconds:
+                name = f"{self.prefix}_query_seconds"
+                lines += [f"# HELP {name} Wall time of route queries", f"# TYPE {name} histogram"]
+                for engine, histogram in sorted(self._query_seconds.items()):
+                    lines += histogram.lines(name, _labels({"engine": engine}))
+            for counter, help_text in SEARCH_COUNTERS.items():
+                histograms = sorted((engine, h) for (c, engine), h in self._search.items() if c == counter)
+                if not histograms:
+                    continue
+                name = f"{self.prefix}_search_{counter}"
+                lines += [f"# HELP {name} {help_text} per query", f"# TYPE {name} histogram"]
+                for engine, histogram in histograms:
+                    lines += histogram.lines(name, _labels({"engine": engine}))
+            collectors = list(self._collectors.items())
+        for metric, (help_text, series) in collectors:
+            name = f"{self.prefix}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{{{_labels(labels)}}} {read()}" if labels else f"{name} {read()}"
+                      for labels, read in series]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,155 @@
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+from compact import CompactGraph
+
+
+@dataclass
+class ParetoLabel:
+    """A route on the Pareto front: its criteria and the edges ridden"""
+    distance: float
+    boardings: int
+    fare: int
+    edges: List[Tuple[int, int, int]]  # (from halte, to halte, route id) in ride order
+
+    @property
+    def transfers(self) -> int:
+        return max(self.boardings - 1, 0)
+
+
+class ParetoRouter:
+    """Multi-criteria label-setting search over distance, boardings and fare (Martins' algorithm)
+
+    Every halte keeps a bag of labels (distance, boardings, fare, route
+    ridden in) that no other label there dominates. Riding on along the same
+    route is free; a different route costs a boarding and that route's
+    fare. Label A makes label B redundant when A is no worse on every
+    criterion and either rides the same route or could change to B's route
+    and still be no worse, so labels differing only in the route ridden are
+    kept apart just as long as that matters. Labels leave the queue in
+    order of distance plus a lower bound to the target, which also prunes
+    any label the routes already found at the target dominate.
+    """
+
+    def __init__(self, graph: CompactGraph, fares: Sequence[int]):
+        self.graph = graph
+        self.fares = list(fares)  # per route id
+        self.cheapest_fare = min(self.fares, default=0)
+        # Route ids serving each halte, for the boardings still needed to reach a target
+        self.stop_routes: List[Set[int]] = [set() for _ in range(len(graph.offsets_list) - 1)]
+        offsets, targets, route_ids = graph.offsets_list, graph.targets_list, graph.route_ids_list
+        for node in range(len(self.stop_routes)):
+            for slot in range(offsets[node], offsets[node + 1]):
+                self.stop_routes[node].add(route_ids[slot])
+                self.stop_routes[targets[slot]].add(route_ids[slot])
+        # Routes sharing a halte, i.e. one boarding apart
+        self.route_neighbors: List[Set[int]] = [set() for _ in self.fares]
+        for routes in self.stop_routes:
+            for route in routes:
+                self.route_neighbors[route] |= routes
+
+    def front(self, source: int, target: int, bounds: Sequence[float],
+              max_boardings: int = 5) -> Tuple[List[ParetoLabel], Tuple[int, int, int]]:
+        """Pareto-optimal routes from source to target, shortest first, and (expanded, pushes, queued) for metrics
+
+        bounds[i] is a lower bound on the distance from halte i to target.
+        """
+        graph, fares, cheapest_fare = self.graph, self.fares, self.cheapest_fare
+        # Boardings still needed after riding each route to reach the target (breadth-first over routes)
+        needed = [max_boardings] * len(fares)
+        level = self.stop_routes[target]
+        for depth in range(max_boardings):
+            for route in level:
+                needed[route] = depth
+            level = {neighbor for route in level for neighbor in self.route_neighbors[route] if needed[neighbor] > depth}
+            if not level:
+                break
+        offsets, targets, weights, route_ids = graph.offsets_list, graph.targets_list, graph.weights_list, graph.route_ids_list
+        # Labels are (distance, boardings, fare, halte, route id, parent label); -1 for no route / no parent
+        labels: List[Tuple[float, int, int, int, int, int]] = [(0.0, 0, 0, source, -1, -1)]
+        bags: Dict[int, List[int]] = {source: [0]}
+        dead = set()
+        found: List[int] = []
+        queue = [(bounds[source], 0, 0, 0)]
+        pushes = 1
+        expanded = 0
+
+        def dominated_at_target(distance: float, boardings: int, fare: int) -> bool:
+            for index in found:
+                other = labels[index]
+                if other[0] <= distance and other[1] <= boardings and other[2] <= fare:
+                    return True
+            return False
+
+        while queue:
+            key, _, _, index = heapq.heappop(queue)
+            if index in dead:
+                continue
+            distance, boardings, fare, node, route, _ = labels[index]
+            if dominated_at_target(key, boardings, fare):
+                dead.add(index)
+                continue
+            if node == target:
+                # Rounding in the bounds can let a dominated route reach the target first
+                found = [other for other in found
+                         if not (distance <= labels[other][0] and boardings <= labels[other][1] and fare <= labels[other][2])]
+                found.append(index)
+                continue
+            expanded += 1
+            for slot in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[slot]
+                bound = bounds[neighbor]
+                if bound == float('inf'):
+                    continue
+                next_route = route_ids[slot]
+                if next_route == route:
+                    next_boardings, next_fare = boardings, fare
+                else:
+                    next_boardings, next_fare = boardings + 1, fare + fares[next_route]
+                    if next_boardings > max_boardings:
+                        continue
+                next_distance = distance + weights[slot]
+                more = needed[next_route]
+                if next_boardings + more > max_boardings or dominated_at_target(
+                        next_distance + bound, next_boardings + more, next_fare + more * cheapest_fare):
+                    continue
+                bag = bags.setdefault(neighbor, [])
+                change_fare = fares[next_route]
+                redundant = False
+                for other_index in bag:
+                    other = labels[other_index]
+                    if other[0] <= next_distance and (
+                            other[4] == next_route and other[1] <= next_boardings and other[2] <= next_fare
+                            or other[1] < next_boardings and other[2] + change_fare <= next_fare):
+                        redundant = True
+                        break
+                if redundant:
+                    continue
+                # Drop the labels the new one makes redundant
+                kept = []
+                for other_index in bag:
+                    other = labels[other_index]
+                    if next_distance <= other[0] and (
+                            next_route == other[4] and next_boardings <= other[1] and next_fare <= other[2]
+                            or next_boardings < other[1] and next_fare + fares[other[4]] <= other[2]):
+                        dead.add(other_index)
+                    else:
+                        kept.append(other_index)
+                kept.append(len(labels))
+                bags[neighbor] = kept
+                heapq.heappush(queue, (next_distance + bound, next_boardings, next_fare, len(labels)))
+                labels.append((next_distance, next_boardings, next_fare, neighbor, next_route, index))
+                pushes += 1
+
+        front = []
+        for index in sorted(found, key=lambda index: labels[index][:3]):
+            distance, boardings, fare, _, _, _ = labels[index]
+            edges = []
+            while labels[index][5] != -1:
+                _, _, _, node, route, parent = labels[index]
+                edges.append((labels[parent][3], node, route))
+                index = parent
+            edges.reverse()
+            front.append(ParetoLabel(distance, boardings, fare, edges))
+        return front, (expanded, pushes, len(queue))
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Shorter than this (km) is not an improvement: splitting a ride at a stop only changes the rounding
+DISTANCE_EPSILON = 1e-9
+
+
+@dataclass
+class Journey:
+    """A RAPTOR result: the legs ridden and the total distance in km"""
+    distance: float
+    legs: List[Tuple[str, List[int]]]  # (route name, halte indices from boarding to alighting)
+
+    @property
+    def transfers(self) -> int:
+        return len(self.legs) - 1
+
+
+class RaptorRouter:
+    """Round-based routing over route stop sequences (RAPTOR without timetables)
+
+    Every route is scanned as two patterns, one per direction. Round k
+    improves the best distance of each halte reachable with at most k
+    rides, so the rounds directly give the best journey for each number
+    of transfers. Riding from position i to j of a pattern costs the
+    cumulative distance between them.
+
+    Without a timetable there is nothing for the rounds to save over a
+    shortest-path search: every round scans whole patterns, so a query
+    costs several times an A* over the compact graph on large networks,
+    even with the lower bounds pruning it. Use it for the transfer
+    front, not for the shortest route alone.
+    """
+
+    def __init__(self, route_sequences: Dict[str, Sequence[int]], halte_distances: np.ndarray):
+        self.stop_count = len(halte_distances)
+        self.pattern_routes: List[str] = []
+        self.pattern_stops: List[List[int]] = []
+        self.pattern_offsets: List[List[float]] = []
+        self.stop_patterns: List[List[Tuple[int, int]]] = [[] for _ in range(self.stop_count)]
+        for route, stops in route_sequences.items():
+            for direction in (list(stops), list(reversed(stops))):
+                if len(direction) < 2:
+                    continue
+                segments = halte_distances[direction[:-1], direction[1:]]
+                pattern = len(self.pattern_stops)
+                self.pattern_routes.append(route)
+                self.pattern_stops.append(direction)
+                self.pattern_offsets.append([0.0] + np.cumsum(segments).tolist())
+                for position, stop in enumerate(direction):
+                    self.stop_patterns[stop].append((pattern, position))
+
+    def journeys(self, source: int, target: int, max_rounds: Optional[int] = 5,
+                 bounds: Optional[Sequence[float]] = None) -> List[Journey]:
+        """Pareto-optimal journeys by (rides, distance) with at most max_rounds rides, fewest rides first
+
+        With max_rounds None the rounds go on until no halte improves, so the
+        last journey is the shortest one. bounds[i], a lower bound on the
+        distance from halte i to target, prunes every label that cannot lead
+        to a shorter journey than the best one found.
+        """
+        inf = float('inf')
+        if bounds is None:
+            bounds = [0.0] * self.stop_count
+        previous = [inf] * self.stop_count
+        previous[source] = 0.0
+        best = previous[:]
+        parents: List[Dict[int, Tuple[int, int, int]]] = [{}]
+        marked = {source}
+        found: List[Journey] = []
+        pattern_stops, pattern_offsets, stop_patterns = self.pattern_stops, self.pattern_offsets, self.stop_patterns
+        k = 0
+        while max_rounds is None or k < max_rounds:
+            k += 1
+            current = previous[:]
+            round_parents: Dict[int, Tuple[int, int, int]] = {}
+            # Earliest marked position on every pattern serving a marked stop. With consistent bounds a
+            # ride only adds to label + bound, so stops that cannot beat the target any more are left out.
+            limit = best[target]
+            queue: Dict[int, int] = {}
+            for stop in marked:
+                if previous[stop] + bounds[stop] >= limit:
+                    continue
+                for pattern, position in stop_patterns[stop]:
+                    if position < queue.get(pattern, inf):
+                        queue[pattern] = position
+            marked = set()
+            for pattern, first in queue.items():
+                stops = pattern_stops[pattern]
+                offsets = pattern_offsets[pattern]
+                carry = inf  # best label minus offset over the boarding stops seen so far
+                board = -1
+                for position in range(first, len(stops)):
+                    stop = stops[position]
+                    offset = offsets[position]
+                    arrival = carry + offset
+                    if arrival < best[stop] - DISTANCE_EPSILON and arrival + bounds[stop] < limit:
+                        current[stop] = arrival
+                        best[stop] = arrival
+                        round_parents[stop] = (pattern, board, position)
+                        marked.add(stop)
+                        if stop == target:
+                            limit = arrival - DISTANCE_EPSILON
+                    label = previous[stop] - offset
+                    if label < carry and previous[stop] + bounds[stop] < limit:
+                        carry = label
+                        board = position
+            parents.append(round_parents)
+            if target in round_parents:
+                found.append(self._journey(parents, k, target, current[target]))
+            if not marked:
+                break
+            previous = current
+        return found
+
+    def _journey(self, parents: List[Dict[int, Tuple[int, int, int]]], rounds: int, target: int, distance: float) -> Journey:
+        legs = []
+        stop = target
+        k = rounds
+        while k > 0:
+            if stop not in parents[k]:
+                k -= 1
+                continue
+            pattern, board, alight = parents[k][stop]
+            stops = self.pattern_stops[pattern]
+            legs.append((self.pattern_routes[pattern], stops[board:alight + 1]))
+            stop = stops[board]
+            k -= 1
+        legs.reverse()
+        return Journey(distance=distance, legs=legs)
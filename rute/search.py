@@ -0,0 +1,152 @@
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+MIN_SIMILARITY = 0.4  # trigram Dice coefficient a typo'd word must reach
+
+# Per query word: how well a record word matches it (fuzzy matches score their similarity, below 1)
+EXACT, PREFIX, SUBSTRING = 4.0, 3.0, 2.0
+
+
+def normalize(text: str) -> str:
+    """Lowercase, accents stripped, punctuation turned into single spaces"""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "words")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.words: List[int] = []  # every vocabulary word with this prefix
+
+
+class SearchIndex:
+    """Typo-tolerant lookup over the id and name of a list of records (haltes or wisata)
+
+    Names are split into words. A prefix trie answers autocomplete prefixes,
+    trigram postings find words containing the query or resembling it, and
+    every query word must match some word of a record. Records rank by how
+    well their words match (exact > prefix > substring > typo), then by name
+    length.
+    """
+
+    def __init__(self, records: Sequence[Dict], fields: Sequence[str] = ("id", "name")):
+        self.records = records
+        self._exact: Dict[str, int] = {}
+        self._lengths: List[int] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._word_records: List[List[int]] = []
+        self._word_trigrams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._trie = _TrieNode()
+        for index, record in enumerate(records):
+            texts = [normalize(record.get(field, "")) for field in fields]
+            for text in texts:
+                self._exact.setdefault(text, index)
+            self._lengths.append(len(texts[-1]))
+            for word in dict.fromkeys(" ".join(texts).split()):
+                self._word_records_for(word).append(index)
+
+    def _word_records_for(self, word: str) -> List[int]:
+        word_id = self._vocabulary.get(word)
+        if word_id is None:
+            word_id = self._vocabulary[word] = len(self._words)
+            self._words.append(word)
+            self._word_records.append([])
+            trigrams = _trigrams(word)
+            self._word_trigrams.append(trigrams)
+            for trigram in trigrams:
+                self._postings.setdefault(trigram, []).append(word_id)
+            node = self._trie
+            node.words.append(word_id)
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+                node.words.append(word_id)
+        return self._word_records[word_id]
+
+    def exact(self, text: str) -> Optional[int]:
+        """Index of the record whose id or name equals text (ignoring case and punctuation), or None"""
+        return self._exact.get(normalize(text))
+
+    def _word_grades(self, word: str) -> Dict[int, float]:
+        """{vocabulary word: grade} for every word matching one query word"""
+        grades: Dict[int, float] = {}
+        node = self._trie
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            for word_id in node.words:
+                grades[word_id] = PREFIX
+        if word in self._vocabulary:
+            grades[self._vocabulary[word]] = EXACT
+        if len(word) < 3 or not word.isalpha():
+            return grades  # too short for trigrams, or an ID-like word where typos mean another halte
+        trigrams = _trigrams(word)
+        shared = Counter(word_id for trigram in trigrams for word_id in self._postings.get(trigram, ()))
+        for word_id, count in shared.items():
+            if word_id in grades:
+                continue
+            if word in self._words[word_id]:
+                grades[word_id] = SUBSTRING
+                continue
+            similarity = 2 * count / (len(trigrams) + len(self._word_trigrams[word_id]))
+            if similarity >= MIN_SIMILARITY:
+                grades[word_id] = similarity
+        return grades
+
+    def resolve(self, query: str, limit: int = 10) -> Tuple[Optional[int], List[int]]:
+        """(record index, []) when query names one record, else (None, up to limit candidate indices, best first)
+
+        A query names a record when it equals the record's id or name, when
+        it matches no other record, or when no other record matches every
+        query word exactly.
+        """
+        exact = self.exact(query)
+        if exact is not None:
+            return exact, []
+        matches = self.search(query, limit=None)
+        whole_words = EXACT * len(normalize(query).split())
+        complete = [index for index, score in matches if score >= whole_words]
+        if len(matches) == 1:
+            return matches[0][0], []
+        if len(complete) == 1:
+            return complete[0], []
+        return None, [index for index, _ in matches[:limit]]
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[Tuple[int, float]]:
+        """(record index, score) of the best matches for query, best first; limit None returns all"""
+        text = normalize(query)
+        words = text.split()
+        if not words:
+            return []
+        scores: Dict[int, float] = {}
+        for position, word in enumerate(words):
+            best: Dict[int, float] = {}
+            for word_id, grade in self._word_grades(word).items():
+                for index in self._word_records[word_id]:
+                    if grade > best.get(index, 0.0):
+                        best[index] = grade
+            if position == 0:
+                scores = best
+            else:
+                scores = {index: score + best[index] for index, score in scores.items() if index in best}
+            if not scores:
+                return []
+        if text in self._exact:
+            scores[self._exact[text]] = scores.get(self._exact[text], 0.0) + EXACT
+        rank = lambda item: (-item[1], self._lengths[item[0]], item[0])
+        if limit is None:
+            return sorted(scores.items(), key=rank)
+        return heapq.nsmallest(limit, scores.items(), key=rank)
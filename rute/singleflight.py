@@ -0,0 +1,76 @@
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(result, shared): shared is True when the result came from another caller's computation"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def private_copy(value: Any) -> Any:
+    """Copy of a route result down to its lists, so callers may annotate or mutate it freely
+
+    Shared results (a coalesced call, the precomputed route table) are only
+    ever handed out through this. Values other than dicts and lists are
+    immutable in route results and are shared as they are.
+    """
+    if isinstance(value, dict):
+        return {key: private_copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [private_copy(item) for item in value]
+    return value
+
+
+def coalesced(method: Callable) -> Callable:
+    """Method decorator: identical concurrent calls on one object share a single computation
+
+    The object must have an ``_inflight`` SingleFlight; arguments must be hashable.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        result, _ = self._inflight.do(key, lambda: method(self, *args, **kwargs))
+        return private_copy(result)
+    return wrapper
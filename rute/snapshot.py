@@ -0,0 +1,190 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"BSTSNAP\0"
+SNAPSHOT_VERSION = 2
+_PREFIX = struct.Struct("<8sII")  # magic, format version, header length
+_ALIGN = 64
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class Snapshot:
+    """A loaded network snapshot: JSON metadata plus read-only arrays backed by one memory map
+
+    Every process that loads the same file shares the mapped pages, so the
+    distance matrices and CSR arrays are not copied per worker.
+    """
+
+    def __init__(self, path: str, meta: Dict, arrays: Dict[str, np.ndarray], mapping: mmap.mmap):
+        self.path = path
+        self.meta = meta
+        self.arrays = arrays
+        self._mapping = mapping
+
+
+def write_arrays(path: str, meta: Dict, arrays: Dict[str, np.ndarray],
+                 magic: bytes = SNAPSHOT_MAGIC, version: int = SNAPSHOT_VERSION) -> str:
+    """Write JSON metadata and raw arrays to path in the snapshot layout
+
+    Layout: prefix (magic, version, header length), JSON header with meta and
+    an array table, then 64-byte aligned raw arrays.
+    """
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps(dict(meta, arrays=table)).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    # Write next to the target and rename, so running workers keep their old mapping intact
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(magic, version, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            if array.nbytes:
+                f.seek(data_start + table[name]["offset"])
+                f.write(memoryview(np.ascontiguousarray(array)).cast("B"))
+    os.replace(tmp_path, path)
+    return os.path.abspath(path)
+
+
+def read_arrays(path: str, magic: bytes = SNAPSHOT_MAGIC, version: int = SNAPSHOT_VERSION,
+                kind: str = "network snapshot") -> Snapshot:
+    """Memory-map a file written by write_arrays; raises ValueError for foreign files or other format versions"""
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapping) < _PREFIX.size:
+        raise ValueError(f"{path} is not a {kind}")
+    found_magic, found_version, header_length = _PREFIX.unpack_from(mapping, 0)
+    if found_magic != magic:
+        raise ValueError(f"{path} is not a {kind}")
+    if found_version != version:
+        raise ValueError(f"{kind.capitalize()} {path} has format version {found_version}, expected {version}")
+    meta = json.loads(mapping[_PREFIX.size:_PREFIX.size + header_length])
+    data_start = _aligned(_PREFIX.size + header_length)
+    arrays = {}
+    for name, spec in meta.pop("arrays").items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        if count == 0:
+            arrays[name] = np.empty(spec["shape"], dtype=dtype)
+        else:
+            arrays[name] = np.frombuffer(mapping, dtype=dtype, count=count,
+                                         offset=data_start + spec["offset"]).reshape(spec["shape"])
+    return Snapshot(path, meta, arrays, mapping)
+
+
+def data_fingerprint(value) -> str:
+    """Digest of a JSON-serializable value, e.g. the records a network was built from"""
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """Digest of a file's bytes, or of every file under a directory with its relative name"""
+    if os.path.isdir(path):
+        files = sorted(os.path.relpath(os.path.join(root, name), path)
+                       for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [""]
+    digest = hashlib.sha1()
+    for name in files:
+        digest.update(name.encode("utf-8") + b"\0")
+        with open(os.path.join(path, name) if name else path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def compile_snapshot(system, path: str, source: Optional[Dict] = None) -> str:
+    """Serialize a BusRouteSystem's processed network to a versioned binary file at path (see write_arrays)
+
+    source describes the data the network was built from ({"kind": "builtin"
+    or "gtfs", "path": ..., "fingerprint": ...}); load_network rebuilds the
+    snapshot once that data changes.
+    """
+    arrays = {
+        "halte_distances": system.halte_distances,
+        "halte_wisata_distances": system.halte_wisata_distances,
+        "offsets": system.compact_graph.offsets,
+        "targets": system.compact_graph.targets,
+        "weights": system.compact_graph.weights,
+        "route_ids": system.compact_graph.route_ids,
+        "from_landmark": system.landmark_heuristic.from_landmark,
+        "to_landmark": system.landmark_heuristic.to_landmark,
+        "dep_stop": system.timetable.dep_stop,
+        "arr_stop": system.timetable.arr_stop,
+        "dep_time": system.timetable.dep_time,
+        "arr_time": system.timetable.arr_time,
+        "trip": system.timetable.trip,
+        "next_in_trip": system.timetable.next_in_trip,
+    }
+    # Tables computed on demand (large networks) are rebuilt from the halte and wisata records instead
+    arrays = {name: array for name, array in arrays.items() if isinstance(array, np.ndarray)}
+    meta = {
+        "halte_data": system.halte_data,
+        "wisata_data": system.wisata_data,
+        "route_sequences": system.route_sequences,
+        "route_colors": system.route_colors,
+        "route_shapes": system.route_shapes,
+        "route_fares": system.route_fares,
+        "landmarks": system.landmark_heuristic.landmarks,
+        "trip_routes": system.timetable.trip_routes,
+        "source": source,
+    }
+    return write_arrays(path, meta, arrays)
+
+
+def load_snapshot(path: str) -> Snapshot:
+    """Memory-map a snapshot file; raises ValueError for foreign files or other format versions"""
+    return read_arrays(path)
+
+
+def load_network(path: str):
+    """BusRouteSystem from the snapshot at path, recompiled first when its source data has changed
+
+    Snapshots of the built-in network are checked against the data in ai.py,
+    GTFS snapshots against their feed (when it is still there). Snapshots
+    without a recorded source are loaded as they are.
+    """
+    from ai import BusRouteSystem, builtin_source
+
+    source = load_snapshot(path).meta.get("source") or {}
+    if source.get("kind") == "builtin":
+        current, rebuild = builtin_source(), BusRouteSystem
+    elif source.get("kind") == "gtfs" and os.path.exists(source["path"]):
+        from gtfs import feed_source, load_gtfs
+        current, rebuild = feed_source(source["path"]), lambda: load_gtfs(source["path"])
+    else:
+        current = rebuild = None
+    if rebuild is not None and current != source:
+        print(f"⚠️  Data sumber snapshot '{path}' telah berubah, snapshot dibangun ulang")
+        try:
+            compile_snapshot(rebuild(), path, current)
+        except OSError as e:
+            print(f"❌ Snapshot tidak dapat ditulis ulang ({e}), jaringan dibangun tanpa snapshot")
+            return rebuild()
+    return BusRouteSystem.from_snapshot(path)
+
+
+def main():
+    from ai import BusRouteSystem, builtin_source
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "jaringan.snap"
+    path = compile_snapshot(BusRouteSystem(), output_path, builtin_source())
+    print(f"✅ Snapshot jaringan disimpan sebagai '{path}' (versi {SNAPSHOT_VERSION})")
+
+
+if __name__ == "__main__":
+    main()
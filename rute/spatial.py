@@ -0,0 +1,100 @@
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+from distance import EARTH_RADIUS_KM, haversine_pairs
+
+KM_PER_DEGREE = math.radians(1) * EARTH_RADIUS_KM
+
+
+class GridIndex:
+    """Bucket points into a uniform lat/lon grid for k-nearest and within-radius queries"""
+
+    def __init__(self, lat, lon, cell_km: float = 0.5):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell_km = cell_km
+        ref_lat = float(np.mean(self.lat)) if len(self.lat) else 0.0
+        self.cell_lat = cell_km / KM_PER_DEGREE
+        self.cell_lon = cell_km / (KM_PER_DEGREE * math.cos(math.radians(ref_lat)))
+        # Smallest cell width over the indexed latitudes, used as the ring distance bound;
+        # the 1% slack covers great-circle distances being shorter than grid distances
+        max_abs_lat = float(np.max(np.abs(self.lat))) if len(self.lat) else 0.0
+        self._min_cell_km = 0.99 * min(cell_km, self.cell_lon * KM_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+        self.buckets: Dict[Tuple[int, int], np.ndarray] = {}
+        if len(self.lat):
+            rows = np.floor(self.lat / self.cell_lat).astype(np.int64)
+            cols = np.floor(self.lon / self.cell_lon).astype(np.int64)
+            order = np.lexsort((cols, rows))
+            keys = np.stack([rows[order], cols[order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, starts):
+                self.buckets[(int(rows[chunk[0]]), int(cols[chunk[0]]))] = np.sort(chunk)
+            self._row_range = (int(rows.min()), int(rows.max()))
+            self._col_range = (int(cols.min()), int(cols.max()))
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon)
+
+    def _gather(self, cells) -> np.ndarray:
+        chunks = [self.buckets[c] for c in cells if c in self.buckets]
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(chunks))
+
+    def _ranked(self, candidates: np.ndarray, lat: float, lon: float) -> Tuple[np.ndarray, np.ndarray]:
+        distances = haversine_pairs(
+            np.full(len(candidates), lat), np.full(len(candidates), lon),
+            self.lat[candidates], self.lon[candidates]
+        )
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of all points within radius_km, nearest first"""
+        if not self.buckets:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        row_lo, col_lo = self._cell(lat - dlat, lon - dlon)
+        row_hi, col_hi = self._cell(lat + dlat, lon + dlon)
+        row_lo, row_hi = max(row_lo, self._row_range[0]), min(row_hi, self._row_range[1])
+        col_lo, col_hi = max(col_lo, self._col_range[0]), min(col_hi, self._col_range[1])
+        cells = ((r, c) for r in range(row_lo, row_hi + 1) for c in range(col_lo, col_hi + 1))
+        indices, distances = self._ranked(self._gather(cells), lat, lon)
+        keep = distances <= radius_km
+        return indices[keep], distances[keep]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of the k nearest points, nearest first"""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        row, col = self._cell(lat, lon)
+        max_ring = max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1])
+        )
+        found = []
+        ring = 0
+        while True:
+            if ring == 0:
+                cells = [(row, col)]
+            else:
+                cells = [(row + dr, col + dc) for dr in range(-ring, ring + 1) for dc in (-ring, ring)]
+                cells += [(row + dr, col + dc) for dr in (-ring, ring) for dc in range(-ring + 1, ring)]
+            found.append(self._gather(cells))
+            candidates = np.concatenate(found)
+            # Anything outside the rings scanned so far is at least ring * cell width away
+            if len(candidates) >= k:
+                indices, distances = self._ranked(np.sort(candidates), lat, lon)
+                if distances[k - 1] <= ring * self._min_cell_km or ring >= max_ring:
+                    return indices[:k], distances[:k]
+            elif ring >= max_ring:
+                indices, distances = self._ranked(np.sort(candidates), lat, lon)
+                return indices[:k], distances[:k]
+            ring += 1
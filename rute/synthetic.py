@@ -0,0 +1,186 @@
+import argparse
+import json
+import math
+from itertools import cycle
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai import BusRouteSystem, ROUTE_COLORS
+from spatial import KM_PER_DEGREE
+
+# Bounding box of the built-in Solo network; larger networks grow it around its centre
+SOLO_BOUNDS = (-7.5760, 110.7470, -7.5300, 110.8610)  # south, west, north, east
+BASE_STOPS = 1000  # networks up to this size keep the Solo bounding box
+STOP_SPACING_KM = 0.4
+
+_PLACE_KINDS = ["Pasar", "Taman", "Terminal", "Stasiun", "Kampung", "Masjid", "Sekolah", "Kantor", "Simpang", "Perumahan"]
+_PLACE_NAMES = ["Mawar", "Melati", "Kenanga", "Cempaka", "Slamet", "Sudirman", "Kartini", "Pemuda", "Merdeka",
+                "Bengawan", "Sriwedari", "Laweyan", "Jebres", "Banjarsari", "Serengan", "Kartasura", "Palur", "Gentan"]
+_WISATA_KINDS = ["Museum", "Taman", "Pasar", "Galeri", "Kampung Batik", "Pura", "Benteng", "Danau"]
+_HOURS = ["24 jam", "08:00 - 16:00", "09:00 - 17:00", "17:00 - 23:00",
+          "09:00 - 18:00 (weekday), 08:00 - 18:00 (weekend)", "Tue-Sun 10:00-15:00"]
+_COSTS = ["Free", "Free", "Rp10,000", "Rp25,000", "Rp10,000 (general), Rp5,000 (student)", "Rp50,000"]
+
+
+class _StopGrid:
+    """Grid buckets of the stops placed so far, for snapping route points to nearby stops"""
+
+    def __init__(self, cell_km: float):
+        self.cell_km = cell_km
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def _cell(self, y_km: float, x_km: float) -> Tuple[int, int]:
+        return int(math.floor(y_km / self.cell_km)), int(math.floor(x_km / self.cell_km))
+
+    def add(self, stop: int, y_km: float, x_km: float) -> None:
+        self.cells.setdefault(self._cell(y_km, x_km), []).append(stop)
+
+    def near(self, y_km: float, x_km: float) -> List[int]:
+        row, col = self._cell(y_km, x_km)
+        return [stop for dr in (-1, 0, 1) for dc in (-1, 0, 1) for stop in self.cells.get((row + dr, col + dc), ())]
+
+
+def generate_network(stops: int = 1000, routes: Optional[int] = None, route_length: int = 25,
+                     overlap: float = 0.2, attractions: Optional[int] = None, seed: int = 0) -> Dict:
+    """BusRouteSystem keyword arguments for a deterministic synthetic network
+
+    Exactly `stops` haltes are laid out along routes that wander across the
+    Solo bounding box (scaled up around its centre beyond BASE_STOPS haltes to
+    keep a realistic stop density). Each route after the first starts at an
+    existing halte, so the network is connected; every further point becomes a
+    shared halte of another route with probability `overlap`. At least
+    `routes` routes are generated (default: enough to place all stops) and
+    more are added until every halte exists. `attractions` wisata (default:
+    one per 20 haltes) are placed near random haltes. Same arguments, same
+    network.
+    """
+    if stops < 2 or route_length < 2:
+        raise ValueError("A network needs at least 2 stops and routes of at least 2 stops")
+    rng = np.random.default_rng(seed)
+    overlap = min(max(overlap, 0.0), 0.95)
+    if routes is None:
+        routes = max(1, math.ceil((stops - 1) / ((route_length - 1) * (1 - overlap))))
+    if attractions is None:
+        attractions = max(1, stops // 20)
+
+    south, west, north, east = SOLO_BOUNDS
+    grow = math.sqrt(max(1.0, stops / BASE_STOPS))
+    center_lat, center_lon = (south + north) / 2, (west + east) / 2
+    km_per_lon = KM_PER_DEGREE * math.cos(math.radians(center_lat))
+    height_km = (north - south) * KM_PER_DEGREE * grow
+    width_km = (east - west) * km_per_lon * grow
+
+    ys: List[float] = []
+    xs: List[float] = []
+    grid = _StopGrid(STOP_SPACING_KM)
+
+    def new_stop(y: float, x: float) -> int:
+        ys.append(y)
+        xs.append(x)
+        grid.add(len(ys) - 1, y, x)
+        return len(ys) - 1
+
+    def nearest(y: float, x: float, exclude: set) -> Optional[int]:
+        candidates = [stop for stop in grid.near(y, x) if stop not in exclude]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda stop: (ys[stop] - y) ** 2 + (xs[stop] - x) ** 2)
+
+    sequences: List[List[int]] = []
+    attempts = 0
+    while len(ys) < stops or (len(sequences) < routes and attempts < 10 * routes):
+        attempts += 1
+        if ys:
+            current = int(rng.integers(len(ys)))
+            y, x = ys[current], xs[current]
+        else:
+            y, x = rng.uniform(0, height_km), rng.uniform(0, width_km)
+            current = new_stop(y, x)
+        sequence = [current]
+        heading = rng.uniform(0, 2 * math.pi)
+        for _ in range(route_length - 1):
+            heading += rng.normal(0, 0.35)
+            step = STOP_SPACING_KM * rng.uniform(0.7, 1.3)
+            y, x = y + step * math.sin(heading), x + step * math.cos(heading)
+            # Turn back at the edge of the box
+            if not 0 <= y <= height_km:
+                heading = -heading
+                y = min(max(y, 0.0), height_km)
+            if not 0 <= x <= width_km:
+                heading = math.pi - heading
+                x = min(max(x, 0.0), width_km)
+            shared = None
+            if len(ys) >= stops or rng.random() < overlap:
+                shared = nearest(y, x, set(sequence))
+            if shared is None and len(ys) < stops:
+                sequence.append(new_stop(y, x))
+            elif shared is not None:
+                sequence.append(shared)
+                y, x = ys[shared], xs[shared]
+        if len(sequence) >= 2:
+            sequences.append(sequence)
+
+    halte_data = []
+    width = len(str(stops))
+    base_lat = center_lat - (north - south) * grow / 2
+    base_lon = center_lon - (east - west) * grow / 2
+    for i in range(len(ys)):
+        name = f"{_PLACE_KINDS[i % len(_PLACE_KINDS)]} {_PLACE_NAMES[(i // len(_PLACE_KINDS)) % len(_PLACE_NAMES)]} {i}"
+        halte_data.append({
+            "id": f"H{i:0{width}d}", "name": name,
+            "lat": base_lat + ys[i] / KM_PER_DEGREE,
+            "lon": base_lon + xs[i] / km_per_lon,
+            "routes": [],
+        })
+    route_sequences: Dict[str, List[str]] = {}
+    route_colors: Dict[str, str] = {}
+    palette = cycle(ROUTE_COLORS.values())
+    for number, sequence in enumerate(sequences, start=1):
+        route = f"R{number}"
+        route_sequences[route] = [halte_data[stop]["id"] for stop in sequence]
+        route_colors[route] = next(palette)
+        for stop in dict.fromkeys(sequence):
+            halte_data[stop]["routes"].append(route)
+
+    wisata_data = []
+    for i in range(attractions):
+        halte = halte_data[int(rng.integers(len(halte_data)))]
+        offset_lat, offset_lon = rng.normal(0, 0.15, size=2) / KM_PER_DEGREE
+        wisata_data.append({
+            "id": f"W{i + 1:0{len(str(attractions))}d}",
+            "name": f"{_WISATA_KINDS[i % len(_WISATA_KINDS)]} {_PLACE_NAMES[int(rng.integers(len(_PLACE_NAMES)))]} {i + 1}",
+            "lat": halte["lat"] + offset_lat, "lon": halte["lon"] + offset_lon,
+            "halte": [halte["id"]],
+            "hours": _HOURS[int(rng.integers(len(_HOURS)))],
+            "cost": _COSTS[int(rng.integers(len(_COSTS)))],
+        })
+    return {"halte_data": halte_data, "wisata_data": wisata_data,
+            "route_sequences": route_sequences, "route_colors": route_colors}
+
+
+def synthetic_system(stops: int = 1000, seed: int = 0, **settings) -> BusRouteSystem:
+    """BusRouteSystem over generate_network(stops, seed=seed, ...); other BusRouteSystem options are not accepted"""
+    return BusRouteSystem(**generate_network(stops=stops, seed=seed, **settings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buat jaringan bus sintetis untuk uji skala")
+    parser.add_argument("keluaran", help="file JSON berisi halte_data, wisata_data, route_sequences, route_colors")
+    parser.add_argument("--halte", type=int, default=1000, help="jumlah halte")
+    parser.add_argument("--rute", type=int, default=None, help="jumlah rute minimum (default: dihitung)")
+    parser.add_argument("--panjang-rute", type=int, default=25, help="jumlah halte per rute")
+    parser.add_argument("--tumpang-tindih", type=float, default=0.2, help="peluang halte dipakai bersama rute lain")
+    parser.add_argument("--wisata", type=int, default=None, help="jumlah tempat wisata (default: 1 per 20 halte)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    network = generate_network(args.halte, args.rute, args.panjang_rute, args.tumpang_tindih, args.wisata, args.seed)
+    with open(args.keluaran, "w", encoding="utf-8") as f:
+        json.dump(network, f)
+    print(f"✅ {len(network['halte_data'])} halte, {len(network['route_sequences'])} rute dan "
+          f"{len(network['wisata_data'])} wisata disimpan di '{args.keluaran}'")
+
+
+if __name__ == "__main__":
+    main()
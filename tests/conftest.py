@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The rute modules import each other by bare name, as app.py sets up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rute"))
+
+from ai import BusRouteSystem  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def solo():
+    return BusRouteSystem()
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("berangkat", ["-5:00", "25:99", "48:00", "jam8"])
+def test_invalid_departure_is_a_bad_request(client, berangkat):
+    response = client.get("/api/rute-halte", query_string={"halte_awal": "H09", "halte_tujuan": "H15",
+                                                           "berangkat": berangkat})
+    assert response.status_code == 400
+    assert berangkat in response.get_json()["error"]
+    response = client.get("/api/isokron", query_string={"halte_asal": "H09", "berangkat": berangkat})
+    assert response.status_code == 400
+    response = client.post("/rute-halte", data={"halte_awal": "H09", "halte_tujuan": "H15", "berangkat": berangkat})
+    assert response.status_code == 400
+
+
+def test_departure_route(client):
+    response = client.get("/api/rute-halte", query_string={"halte_awal": "H09", "halte_tujuan": "H15",
+                                                           "berangkat": "08:00"})
+    assert response.status_code == 200
+    assert response.get_json()["route"]["departure_time"] >= "08:00"
+
+
+def test_departure_route_to_the_same_halte_has_the_timed_shape(client):
+    response = client.get("/api/rute-halte", query_string={"halte_awal": "H09", "halte_tujuan": "H09",
+                                                           "berangkat": "08:00"})
+    route = response.get_json()["route"]
+    timed = app.bus_system.find_route("H09", "H15", departure="08:00")
+    assert set(route) == set(timed)
+    assert route["departure_time"] == route["arrival_time"] == "08:00"
+    assert route["legs"] == [] and route["fare"] == 0
+
+
+def test_ambiguous_halte_lists_the_candidates(client):
+    response = client.get("/api/rute-halte", query_string={"halte_awal": "colomadu", "halte_tujuan": "H01"})
+    assert response.status_code == 400
+    assert {candidate["id"] for candidate in response.get_json()["candidates"]} == {"H08", "H16", "H21"}
+
+
+@pytest.mark.parametrize("query, halte_id", [("Sriwedari", "H20"), ("h05", "H05"), ("jurg", "H01"), ("Tirtonadi", "H18")])
+def test_exact_or_unique_halte_is_resolved(query, halte_id):
+    assert app.resolve_halte(query)["id"] == halte_id
@@ -0,0 +1,150 @@
+"""Every routing engine cross-checked against plain Dijkstra, on Solo and on a seeded synthetic network"""
+import random
+
+import pytest
+
+from ai import BusRouteSystem, calculate_travel_distance, calculate_travel_time
+from alternatives import MAX_STRETCH
+from synthetic import generate_network
+
+TOLERANCE = 1e-9
+PAIRS = 60
+MAX_TRANSFERS = 4
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    return BusRouteSystem(**generate_network(300, seed=7))
+
+
+@pytest.fixture(scope="module", params=["solo", "synthetic"])
+def network(request, solo, synthetic):
+    """(system, sampled (start, end) halte pairs, shortest distances per start)"""
+    system = solo if request.param == "solo" else synthetic
+    ids = [halte["id"] for halte in system.halte_data]
+    rng = random.Random(11)
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(PAIRS)]
+    shortest = {start_id: system._dijkstra(start_id)[0] for start_id in {start_id for start_id, _ in pairs}}
+    return system, pairs, shortest
+
+
+def dijkstra_distance(system, shortest, start_id, end_id):
+    return shortest[start_id].get(system.halte_index[end_id])
+
+
+def assert_valid_route(system, route, start_id, end_id):
+    """The path runs start to end over real route edges, and its figures add up"""
+    path, routes = route["path"], route["routes"]
+    assert path[0] == start_id and path[-1] == end_id
+    assert len(routes) == len(path) - 1 == len(route["segment_distances"])
+    for halte_id, next_id, route_name in zip(path, path[1:], routes):
+        assert any(neighbor == next_id and name == route_name for neighbor, _, name in system.graph[halte_id])
+    assert route["total_distance"] == pytest.approx(sum(route["segment_distances"]))
+    assert route["transfers"] == sum(1 for a, b in zip(routes, routes[1:]) if a != b)
+
+
+@pytest.mark.parametrize("engine", ["astar", "bidirectional", "ch", "raptor"])
+def test_engine_finds_the_shortest_distance(network, engine):
+    system, pairs, shortest = network
+    for start_id, end_id in pairs:
+        route = system.find_route(start_id, end_id, engine=engine)
+        expected = dijkstra_distance(system, shortest, start_id, end_id)
+        if expected is None:
+            assert route is None
+            continue
+        assert route["total_distance"] == pytest.approx(expected, abs=TOLERANCE), (start_id, end_id)
+        assert_valid_route(system, route, start_id, end_id)
+
+
+def test_alt_without_landmarks_matches_dijkstra(network):
+    system, pairs, shortest = network
+    plain = BusRouteSystem(halte_data=system.halte_data, wisata_data=system.wisata_data,
+                           route_sequences=system.route_sequences, route_colors=system.route_colors, landmarks=0)
+    for start_id, end_id in pairs:
+        route = plain.a_star(start_id, end_id)
+        assert route["total_distance"] == pytest.approx(dijkstra_distance(system, shortest, start_id, end_id))
+
+
+def test_route_table_matches_dijkstra(solo):
+    system = BusRouteSystem(precompute=True)
+    for start_id in system.halte_dict:
+        g_score = system._dijkstra(start_id)[0]
+        for end_id in system.halte_dict:
+            route = system.find_route(start_id, end_id)
+            assert route["total_distance"] == pytest.approx(g_score[system.halte_index[end_id]])
+            assert route == solo.a_star(start_id, end_id)
+
+
+def test_raptor_front_trades_transfers_for_distance(network):
+    system, pairs, shortest = network
+    for start_id, end_id in pairs:
+        journeys = system.find_journeys(start_id, end_id, max_transfers=None)
+        for journey in journeys:
+            assert_valid_route(system, journey, start_id, end_id)
+        for fewer, more in zip(journeys, journeys[1:]):
+            assert fewer["transfers"] < more["transfers"]
+            assert fewer["total_distance"] > more["total_distance"]
+        assert journeys[-1]["total_distance"] == pytest.approx(dijkstra_distance(system, shortest, start_id, end_id))
+
+
+def test_pareto_front_is_non_dominated(network):
+    system, pairs, shortest = network
+    for start_id, end_id in pairs:
+        front = system.find_pareto_routes(start_id, end_id, max_transfers=MAX_TRANSFERS)
+        best = dijkstra_distance(system, shortest, start_id, end_id)
+        # The front only holds routes within the transfer limit, and the shortest one may need more
+        if system.a_star(start_id, end_id)["transfers"] <= MAX_TRANSFERS:
+            assert front[0]["total_distance"] == pytest.approx(best)
+        else:
+            assert front[0]["total_distance"] > best
+        fastest = system.find_route(start_id, end_id, engine="pareto")
+        assert fastest.pop("pareto") == front
+        assert fastest == front[0]
+        scores = [(route["total_time"], route["transfers"], route["fare"]) for route in front]
+        assert scores == sorted(scores, key=lambda score: score[0])
+        for route, score in zip(front, scores):
+            assert_valid_route(system, route, start_id, end_id)
+            assert route["transfers"] <= MAX_TRANSFERS
+            assert route["fare"] == system.trip_fare(route["routes"])
+            assert not any(other != score and all(a <= b for a, b in zip(other, score)) for other in scores)
+
+
+def test_alternatives_start_with_the_shortest_route(network):
+    system, pairs, shortest = network
+    for start_id, end_id in pairs:
+        routes = system.find_alternative_routes(start_id, end_id, k=3)
+        best = dijkstra_distance(system, shortest, start_id, end_id)
+        assert routes[0]["total_distance"] == pytest.approx(best)
+        assert len({tuple(route["path"]) for route in routes}) == len(routes)
+        for route in routes:
+            assert_valid_route(system, route, start_id, end_id)
+            assert len(set(route["path"])) == len(route["path"])
+            assert route["total_distance"] <= best * MAX_STRETCH + TOLERANCE
+
+
+def test_timetable_route_is_never_faster_than_riding_the_shortest_path(network):
+    system, pairs, shortest = network
+    for start_id, end_id in pairs[:20]:
+        route = system.find_route(start_id, end_id, departure="07:30")
+        riding = calculate_travel_time(dijkstra_distance(system, shortest, start_id, end_id))
+        # Connection times are rounded to the second along each trip
+        assert route["total_time"] >= riding - len(route["path"]) / 60
+        assert route["departure_time"] == "07:30"
+        assert route["legs"][0]["from"] == start_id and route["legs"][-1]["to"] == end_id
+        for leg, next_leg in zip(route["legs"], route["legs"][1:]):
+            assert leg["to"] == next_leg["from"]
+            assert leg["arrival_time"] <= next_leg["departure_time"]
+        later = system.find_route(start_id, end_id, departure="08:30")
+        assert later["arrival_time"] >= route["arrival_time"]
+
+
+def test_isochrone_reaches_exactly_the_haltes_within_the_budget(network):
+    system, pairs, shortest = network
+    minutes = 15
+    for start_id in list(shortest)[:10]:
+        result = system.isochrone(start_id, minutes)
+        budget = calculate_travel_distance(minutes)
+        expected = {system.halte_data[node]["id"]: distance for node, distance in shortest[start_id].items()
+                    if distance <= budget}
+        assert {halte["id"]: halte["distance_km"] for halte in result["haltes"]} == pytest.approx(expected)
+        assert all(wisata["arrival_min"] <= minutes for wisata in result["wisata"])
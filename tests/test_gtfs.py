@@ -0,0 +1,40 @@
+from gtfs import load_gtfs, read_gtfs
+
+STOPS = {"A": (-7.560, 110.800), "B": (-7.560, 110.810), "C": (-7.560, 110.820), "X": (-7.570, 110.815)}
+
+
+def write_feed(path, trips):
+    """A one-route GTFS feed; trips maps trip_id to [(stop_id, "HH:MM:SS"), ...]"""
+    path.mkdir()
+    (path / "stops.txt").write_text("stop_id,stop_name,stop_lat,stop_lon\n" + "".join(
+        f"{stop},Halte {stop},{lat},{lon}\n" for stop, (lat, lon) in STOPS.items()))
+    (path / "routes.txt").write_text("route_id,route_short_name\nr1,R\n")
+    (path / "trips.txt").write_text("trip_id,route_id\n" + "".join(f"{trip},r1\n" for trip in trips))
+    (path / "stop_times.txt").write_text("trip_id,stop_id,stop_sequence,arrival_time,departure_time\n" + "".join(
+        f"{trip},{stop},{i + 1},{clock},{clock}\n" for trip, stops in trips.items() for i, (stop, clock) in enumerate(stops)))
+    return str(path)
+
+
+def test_stops_of_shorter_variants_are_kept(tmp_path):
+    feed = write_feed(tmp_path / "feed", {
+        "t1": [("A", "08:00:00"), ("B", "08:05:00"), ("C", "08:10:00")],
+        "t2": [("A", "09:00:00"), ("B", "09:05:00"), ("X", "09:10:00")],
+    })
+    network = read_gtfs(feed)
+    assert network["route_sequences"] == {"R": ["A", "B", "C"], "R-1": ["A", "B", "X"]}
+    bus_system = load_gtfs(feed)
+    assert bus_system.find_route("A", "X")["routes"] == ["R-1", "R-1"]
+    timed = bus_system.find_route("A", "X", departure="08:30")
+    assert [(leg["route"], leg["departure_time"]) for leg in timed["legs"]] == [("R-1", "09:00")]
+
+
+def test_patterns_covered_by_another_are_merged(tmp_path, capsys):
+    feed = write_feed(tmp_path / "feed", {
+        "t1": [("A", "08:00:00"), ("B", "08:05:00"), ("C", "08:10:00")],
+        "t2": [("C", "09:00:00"), ("B", "09:05:00"), ("A", "09:10:00")],
+        "t3": [("B", "10:00:00"), ("C", "10:05:00")],
+    })
+    network = read_gtfs(feed)
+    assert network["route_sequences"] == {"R": ["A", "B", "C"]}
+    assert "2 pola perjalanan" in capsys.readouterr().out
+    assert set(network["timetable"].trip_routes) == {"R"}
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+from hours import MINUTES_PER_DAY, MINUTES_PER_WEEK, AttractionSchedule, minute_of_week, parse_cost, parse_hours
+
+MONDAY_0900 = datetime(2024, 6, 3, 9, 0)
+
+
+@pytest.mark.parametrize("text, open_minutes, closed_minutes", [
+    ("08:30 - 16:30", [8 * 60 + 30, 6 * MINUTES_PER_DAY + 16 * 60 + 29], [8 * 60 + 29, 16 * 60 + 30]),
+    ("24 jam", [0, MINUTES_PER_WEEK - 1], []),
+    ("09:00 - 18:00 (weekday), 08:00 - 18:00 (weekend)",
+     [9 * 60, 5 * MINUTES_PER_DAY + 8 * 60], [8 * 60, 4 * MINUTES_PER_DAY + 8 * 60 + 30]),
+    ("Tue-Thu 13:00-15:00, Fri-Sun 10:00-15:00", [MINUTES_PER_DAY + 13 * 60, 6 * MINUTES_PER_DAY + 10 * 60],
+     [13 * 60, MINUTES_PER_DAY + 10 * 60]),
+    ("20:00 - 02:00", [20 * 60, MINUTES_PER_DAY + 60, 60], [2 * 60, 19 * 60]),
+])
+def test_parse_hours(text, open_minutes, closed_minutes):
+    intervals = parse_hours(text)
+    is_open = lambda minute: any(start <= minute < end for start, end in intervals)
+    assert all(is_open(minute) for minute in open_minutes)
+    assert not any(is_open(minute) for minute in closed_minutes)
+
+
+def test_unparsable_hours_are_unknown():
+    assert parse_hours("tergantung cuaca") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Rp35,000 (general), Rp15,000 (student)", (15000, 35000)),
+    ("Free", (0, 0)),
+    ("Gratis", (0, 0)),
+    ("hubungi pengelola", (None, None)),
+])
+def test_parse_cost(text, expected):
+    assert parse_cost(text) == expected
+
+
+def test_minute_of_week_wraps_past_sunday():
+    assert minute_of_week(MONDAY_0900) == 9 * 60
+    assert minute_of_week(datetime(2024, 6, 9, 23, 0), offset_minutes=120) == 60
+
+
+def test_schedule_filters_on_opening_hours_and_budget():
+    wisata = [
+        {"hours": "08:00 - 16:00", "cost": "Rp20,000"},
+        {"hours": "24 jam", "cost": "Free"},
+        {"hours": "lihat papan", "cost": "Rp5,000"},
+        {"hours": "Sat-Sun 10:00 - 12:00", "cost": "Rp50,000"},
+    ]
+    schedule = AttractionSchedule(wisata)
+    assert schedule.mask(MONDAY_0900).tolist() == [True, True, True, False]
+    assert schedule.mask(datetime(2024, 6, 3, 17, 0)).tolist() == [False, True, True, False]
+    assert schedule.mask(max_cost=10000).tolist() == [False, True, True, False]
+    assert schedule.mask(MONDAY_0900, max_cost=10000).tolist() == [False, True, True, False]
+    assert schedule.mask() is None
+    assert schedule.is_open(2, 0) is None
+    assert schedule.is_open(3, 5 * MINUTES_PER_DAY + 11 * 60)
+
+
+def test_nearest_wisata_respects_the_filters(solo):
+    wisata_id, _, _ = solo.find_nearest_wisata("H01", open_at=datetime(2024, 6, 3, 3, 0))
+    index = solo.wisata_index[wisata_id]
+    assert solo.wisata_schedule.is_open(index, 3 * 60) is not False
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import ai
+from ai import BusRouteSystem
+from synthetic import generate_network
+
+
+def test_direct_ride_on_shared_corridor_has_no_transfers(solo):
+    # K3 serves H09..H15 on its own; K1 runs alongside it for part of the way
+    route = solo.a_star("H09", "H15")
+    assert set(route["routes"]) == {"K3"}
+    assert route["transfers"] == 0
+
+
+def test_route_keeps_the_bus_that_serves_the_whole_trip(solo):
+    route = solo.a_star("H28", "H29")
+    assert set(route["routes"]) == {"FD10"}
+    assert route["transfers"] == 0
+
+
+def test_a_star_never_transfers_more_than_raptor_at_equal_distance(solo):
+    ids = [halte["id"] for halte in solo.halte_data]
+    for start_id in ids:
+        for end_id in ids:
+            route = solo.a_star(start_id, end_id)
+            if start_id == end_id or route is None:
+                continue
+            journeys = [journey for journey in solo.find_journeys(start_id, end_id)
+                        if abs(journey["total_distance"] - route["total_distance"]) < 1e-9]
+            if journeys:
+                assert route["transfers"] <= min(journey["transfers"] for journey in journeys), (start_id, end_id)
+
+
+def test_precomputed_routes_are_handed_out_as_private_copies():
+    system = BusRouteSystem(precompute=True)
+    route = system.find_route("H08", "H01")
+    route["path"].append("X")
+    route["routes"].clear()
+    again = system.find_route("H08", "H01")
+    assert again["path"][-1] == "H01"
+    assert again["routes"]
+
+
+def test_coalesced_callers_get_private_copies_of_one_search():
+    bus_system = BusRouteSystem()
+    calls = []
+    a_star = bus_system.a_star
+
+    def slow_a_star(start_id, end_id):
+        calls.append((start_id, end_id))
+        time.sleep(0.2)  # long enough for every caller to join the search in flight
+        return a_star(start_id, end_id)
+
+    bus_system.a_star = slow_a_star
+    barrier = threading.Barrier(4)
+    results = [None] * 4
+
+    def query(i):
+        barrier.wait()
+        results[i] = bus_system.find_route("H08", "H01")
+
+    threads = [threading.Thread(target=query, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [("H08", "H01")]
+    assert bus_system._inflight.shared == 3
+    expected = a_star("H08", "H01")
+    results[0]["path"].append("X")
+    results[0]["routes"].clear()
+    assert results[1:] == [expected] * 3
+
+
+def test_raptor_engine_is_not_capped_by_transfers():
+    system = BusRouteSystem(**generate_network(400, seed=7))
+    ids = [halte["id"] for halte in system.halte_data]
+    for start_id, end_id in zip(ids[::7], ids[3::11]):
+        route = system.a_star(start_id, end_id)
+        journey = system.find_route(start_id, end_id, engine="raptor")
+        assert (route is None) == (journey is None)
+        if route:
+            assert abs(route["total_distance"] - journey["total_distance"]) < 1e-9
+
+
+def test_concurrent_first_queries_build_the_hierarchy_once(monkeypatch):
+    builds = []
+    build = ai.ContractionHierarchy.build
+
+    def slow_build(graph):
+        builds.append(graph)
+        time.sleep(0.05)
+        return build(graph)
+
+    monkeypatch.setattr(ai.ContractionHierarchy, "build", staticmethod(slow_build))
+    bus_system = BusRouteSystem()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(bus_system.ch_route("H09", "H15"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(result == bus_system.a_star("H09", "H15") for result in results)
+
+
+def test_fare_counts_the_buses_actually_boarded(solo):
+    assert solo.get_route_analysis(solo.find_route("H09", "H15"))["cost_estimate"] == 3700
+    route = solo.find_route("H08", "H01")
+    assert solo.get_route_analysis(route)["cost_estimate"] == 3700 * (route["transfers"] + 1)
+
+
+def test_trip_without_a_ride_is_free(solo):
+    assert solo.get_route_analysis(solo.find_route("H05", "H05"))["cost_estimate"] == 0
+
+
+def test_one_to_many_search_stops_once_the_targets_are_settled():
+    system = BusRouteSystem(**generate_network(1000, seed=3))
+    metrics = system.enable_metrics()
+    start_id = system.halte_data[0]["id"]
+    neighbor_id = min(system.graph[start_id], key=lambda edge: edge[1])[0]
+    routes = system.find_routes_from(start_id, [neighbor_id])
+    assert routes[neighbor_id]["path"] == [start_id, neighbor_id]
+    expanded = metrics._search[("nodes_expanded", "dijkstra")]
+    assert expanded.count == 1 and expanded.sum == 2
@@ -0,0 +1,67 @@
+import pytest
+
+from ai import search_halte
+from search import SearchIndex, normalize
+
+RECORDS = [
+    {"id": "H01", "name": "Jurug (Solo Safari)"},
+    {"id": "H06", "name": "Sriwedari 1 Selatan"},
+    {"id": "H07", "name": "Sriwedari 2 Selatan"},
+    {"id": "H20", "name": "Sriwedari"},
+    {"id": "H28", "name": "Pasar Klewer"},
+    {"id": "H12", "name": "Pasar Gede"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(RECORDS)
+
+
+def ids(index, query, limit=10):
+    return [RECORDS[i]["id"] for i, _ in index.search(query, limit=limit)]
+
+
+def test_normalize():
+    assert normalize("  Jurug (Solo-Safari)  ") == "jurug solo safari"
+    assert normalize("Pasar Klewér") == "pasar klewer"
+
+
+def test_exact_name_and_id_rank_first(index):
+    assert ids(index, "sriwedari")[0] == "H20"
+    assert ids(index, "h28") == ["H28"]
+
+
+def test_prefix_and_typo_matches(index):
+    assert ids(index, "kle") == ["H28"]
+    assert ids(index, "jurg") == ["H01"]
+    assert ids(index, "sriwdari selatan")[:2] == ["H06", "H07"]
+    assert ids(index, "zzz") == []
+
+
+def test_every_query_word_must_match(index):
+    assert ids(index, "pasar gede") == ["H12"]
+    assert set(ids(index, "pasar")) == {"H28", "H12"}
+
+
+def test_limit(index):
+    assert len(ids(index, "sriwedari", limit=2)) == 2
+    assert len(ids(index, "sriwedari", limit=None)) == 3
+
+
+@pytest.mark.parametrize("query, resolved, candidates", [
+    ("Sriwedari", "H20", []),
+    ("jurg", "H01", []),
+    ("pasar klewer", "H28", []),
+    ("pasar", None, ["H28", "H12"]),
+    ("sriwedari selatan", None, ["H06", "H07"]),
+    ("zzz", None, []),
+])
+def test_resolve_requires_an_unambiguous_query(index, query, resolved, candidates):
+    found, others = index.resolve(query)
+    assert (RECORDS[found]["id"] if found is not None else None) == resolved
+    assert sorted(RECORDS[i]["id"] for i in others) == sorted(candidates)
+
+
+def test_search_halte_on_solo(solo):
+    assert search_halte(solo, "Tirtonadi")[0]["id"] == "H18"
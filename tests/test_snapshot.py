@@ -0,0 +1,45 @@
+import ai
+from ai import BusRouteSystem, builtin_source, search_halte
+from ch import ContractionHierarchy
+from export import all_pairs
+from snapshot import compile_snapshot, load_network, load_snapshot
+from synthetic import synthetic_system
+
+
+def test_snapshot_loads_the_same_network(solo, tmp_path):
+    path = str(tmp_path / "jaringan.snap")
+    compile_snapshot(solo, path, builtin_source())
+    loaded = BusRouteSystem.from_snapshot(path)
+    for start_id, end_id in (("H09", "H15"), ("H21", "H23"), ("H28", "H29")):
+        assert loaded.find_route(start_id, end_id) == solo.find_route(start_id, end_id)
+        assert loaded.find_route(start_id, end_id, departure="08:00") == solo.find_route(start_id, end_id,
+                                                                                        departure="08:00")
+    assert search_halte(loaded, "Jurug") == search_halte(solo, "Jurug")
+
+
+def test_stale_snapshot_is_rebuilt(solo, tmp_path, monkeypatch):
+    path = str(tmp_path / "jaringan.snap")
+    compile_snapshot(solo, path, builtin_source())
+    renamed = [dict(halte, name="Jurug Baru") if halte["id"] == "H01" else halte for halte in ai.HALTE_DATA]
+    monkeypatch.setattr(ai, "HALTE_DATA", renamed)
+    bus_system = load_network(path)
+    assert bus_system.halte_dict["H01"]["name"] == "Jurug Baru"
+    assert load_snapshot(path).meta["source"] == builtin_source()
+
+
+def test_export_pairs_come_from_the_snapshot(tmp_path):
+    system = synthetic_system(40, seed=5)
+    path = compile_snapshot(system, str(tmp_path / "sintetis.snap"))
+    ids = [halte["id"] for halte in system.halte_data]
+    assert all_pairs(path) == [(start_id, end_id) for start_id in ids for end_id in ids if start_id != end_id]
+    assert ("H01", "H29") in all_pairs()
+
+
+def test_saved_hierarchy_answers_from_the_mapped_file(solo, tmp_path):
+    built = ContractionHierarchy.build(solo.compact_graph)
+    loaded = ContractionHierarchy.load(built.save(str(tmp_path / "solo.ch")))
+    # Columns over the read-only mapping, not writable copies of it
+    assert not any(column.obj.flags.writeable for column in loaded._up + loaded._down)
+    for source in range(built.node_count):
+        for target in range(built.node_count):
+            assert loaded.query(source, target)[0] == built.query(source, target)[0]
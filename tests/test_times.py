@@ -0,0 +1,27 @@
+from datetime import time
+
+import pytest
+
+from csa import format_time, seconds_of_day
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("08:00", 8 * 3600),
+    (" 7:05 ", 7 * 3600 + 5 * 60),
+    ("25:30", 25 * 3600 + 30 * 60),
+    ("47:59:59", 48 * 3600 - 1),
+    (time(6, 30, 15), 6 * 3600 + 30 * 60 + 15),
+    (3600, 3600),
+])
+def test_seconds_of_day(value, expected):
+    assert seconds_of_day(value) == expected
+
+
+@pytest.mark.parametrize("value", ["-5:00", "25:99", "08:60", "08:00:60", "48:00", "8", "a:b", "+5:00", -1, 48 * 3600])
+def test_out_of_range_times_are_rejected(value):
+    with pytest.raises(ValueError):
+        seconds_of_day(value)
+
+
+def test_format_time_wraps_past_midnight():
+    assert format_time(25 * 3600 + 30 * 60) == "01:30"